@@ -0,0 +1,398 @@
+"""Paket yöneticisi, executor ve bot handler'ları için çevrimdışı benchmark
+
+Kullanım:
+    python benchmark.py                      # çalıştır, benchmark_baseline.json ile karşılaştır
+    python benchmark.py --quick              # küçük veriyle, benchmark_baseline.quick.json ile karşılaştır
+    python benchmark.py --save-baseline      # sonuçları yeni referans olarak kaydet
+    python benchmark.py --only index imports --output results.json
+
+Tüm veriler geçici bir dizinde üretilir (sahte site-packages, yerel wheel indeksi);
+ağ erişimi gerekmez. Referansa göre tolerans üstünde yavaşlama varsa çıkış kodu 1,
+referans yoksa ya da farklı modda veya ortamda alınmışsa 2'dir.
+"""
+import os
+import sys
+import gc
+import json
+import time
+import random
+import shutil
+import timeit
+import zipfile
+import argparse
+import platform
+import statistics
+import tempfile
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmark_baseline.json')
+QUICK_BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmark_baseline.quick.json')
+SEED = 1234
+# Referansla karşılaştırılabilmesi için aynı olması gereken ortam bilgileri
+MACHINE_KEYS = ('python', 'implementation', 'platform', 'cpu_count')
+
+def measure(func: Callable[[], object], number: int = 1, repeat: int = 5) -> Dict[str, float]:
+    """func'ı repeat tur, her turda number kez çalıştır; işlem başına süreler"""
+    gc.collect()
+    timings = [total / number for total in timeit.Timer(func).repeat(repeat=repeat, number=number)]
+    return {
+        'seconds': statistics.median(timings),
+        'min_seconds': min(timings),
+        'max_seconds': max(timings),
+        'repeat': repeat,
+        'number': number,
+    }
+
+@contextmanager
+def environ(**values: str):
+    """Ortam değişkenlerini geçici olarak ayarla (pip alt süreçleri miras alır)"""
+    previous = {name: os.environ.get(name) for name in values}
+    os.environ.update(values)
+    try:
+        yield
+    finally:
+        for name, value in previous.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+
+# --- Sahte veri üreticileri ---
+
+def make_site_packages(root: str, count: int) -> str:
+    """count adet dağıtım içeren sahte site-packages dizini"""
+    site_packages = os.path.join(root, f'site-packages-{count}')
+    os.makedirs(site_packages, exist_ok=True)
+    for i in range(count):
+        name = f'bench_pkg_{i}'
+        dist_info = os.path.join(site_packages, f'{name}-1.{i % 10}.0.dist-info')
+        os.makedirs(dist_info, exist_ok=True)
+        with open(os.path.join(dist_info, 'METADATA'), 'w', encoding='utf-8') as f:
+            f.write(f'Metadata-Version: 2.1\nName: {name.replace("_", "-")}\nVersion: 1.{i % 10}.0\n')
+    return site_packages
+
+def make_script(path: str, imports: int, functions: int) -> str:
+    """Çok sayıda import ve fonksiyon içeren script üret"""
+    rng = random.Random(SEED)
+    stdlib = sorted(name for name in sys.stdlib_module_names if not name.startswith('_'))
+    lines = []
+    for i in range(imports):
+        module = rng.choice(stdlib)
+        if i % 3 == 0:
+            lines.append(f'from {module} import something_{i}')
+        else:
+            lines.append(f'import {module}')
+    lines.append('import numpy as np')
+    lines.append('from pandas import DataFrame')
+    for i in range(functions):
+        lines.append(f'def function_{i}(x, y={i}):')
+        lines.append(f'    values = [x * k + y for k in range({i % 50})]')
+        lines.append('    if values:')
+        lines.append('        return sum(values) / len(values)')
+        lines.append('    return None')
+        lines.append('')
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(lines) + '\n')
+    return path
+
+def make_wheel(directory: str, name: str, version: str) -> str:
+    """Tek modüllü, bağımlılıksız sahte wheel"""
+    dist = name.replace('-', '_')
+    dist_info = f'{dist}-{version}.dist-info'
+    files = {
+        f'{dist}/__init__.py': f'VERSION = {version!r}\n',
+        f'{dist_info}/METADATA': f'Metadata-Version: 2.1\nName: {name}\nVersion: {version}\n',
+        f'{dist_info}/WHEEL': 'Wheel-Version: 1.0\nGenerator: benchmark\nRoot-Is-Purelib: true\nTag: py3-none-any\n',
+    }
+    record = ''.join(f'{path},,\n' for path in files) + f'{dist_info}/RECORD,,\n'
+    path = os.path.join(directory, f'{dist}-{version}-py3-none-any.whl')
+    with zipfile.ZipFile(path, 'w') as wheel:
+        for file_name, content in files.items():
+            wheel.writestr(file_name, content)
+        wheel.writestr(f'{dist_info}/RECORD', record)
+    return path
+
+# --- Sahte Telegram nesneleri ---
+
+class FakeMessage:
+    """reply_text/edit_text çağrılarını kaydeden Telegram mesajı"""
+
+    def __init__(self, text: str = '', document=None):
+        self.text = text
+        self.document = document
+        self.replies: List[str] = []
+
+    def reply_text(self, text: str, **kwargs) -> 'FakeMessage':
+        self.replies.append(text)
+        return FakeMessage(text)
+
+    def edit_text(self, text: str, **kwargs) -> 'FakeMessage':
+        self.text = text
+        return self
+
+    def reply_document(self, document, **kwargs):
+        self.replies.append(kwargs.get('filename', ''))
+
+class FakeUser:
+    def __init__(self, user_id: int):
+        self.id = user_id
+
+class FakeUpdate:
+    def __init__(self, user_id: int = 1, text: str = ''):
+        self.message = FakeMessage(text)
+        self.effective_user = FakeUser(user_id)
+        self.effective_chat = FakeUser(user_id)
+        self.callback_query = None
+
+class FakeContext:
+    def __init__(self, args: Optional[List[str]] = None):
+        self.args = args or []
+        self.bot_data: dict = {}
+        self.user_data: dict = {}
+        self.error = None
+
+# --- Benchmark'lar ---
+
+class BenchmarkSuite:
+    def __init__(self, workdir: str, quick: bool = False):
+        self.workdir = workdir
+        self.quick = quick
+        self.results: Dict[str, Dict[str, float]] = {}
+        self._executor = None
+
+    def record(self, name: str, result: Dict[str, float]):
+        self.results[name] = result
+        print(f"{name:<40} {result['seconds'] * 1000:>10.3f} ms")
+
+    @property
+    def executor(self):
+        """Script çalıştırma benchmark'larında paylaşılan executor"""
+        if self._executor is None:
+            from package_manager import PackageManager
+            from executor import PythonExecutor
+            self._executor = PythonExecutor(PackageManager())
+        return self._executor
+
+    def close(self):
+        if self._executor is not None and self._executor.pool:
+            self._executor.pool.shutdown()
+
+    def bench_index(self):
+        """Binlerce dağıtımlık site-packages üzerinde indeks sorguları"""
+        from package_manager import PackageManager
+        count = 1000 if self.quick else 5000
+        site_packages = make_site_packages(self.workdir, count)
+
+        self.record(f'index.build[{count}]',
+                    measure(lambda: PackageManager([site_packages]).refresh_index(), repeat=3))
+
+        package_manager = PackageManager([site_packages])
+        names = [f'Bench_Pkg.{i}' for i in range(0, count, 7)] + [f'missing-{i}' for i in range(100)]
+        self.record(f'index.is_package_installed[{count}]',
+                    measure(lambda: [package_manager.is_package_installed(n) for n in names],
+                            number=10))
+        self.record(f'index.get_installed_packages[{count}]',
+                    measure(package_manager.get_installed_packages, number=20))
+
+    def bench_imports(self):
+        """Büyük script'lerde import analizi"""
+        sizes = [(50, 200)] if self.quick else [(50, 200), (500, 5000)]
+        for imports, functions in sizes:
+            path = make_script(os.path.join(self.workdir, f'script_{functions}.py'), imports, functions)
+            self.record(f'imports.extract[{functions}]',
+                        measure(lambda: self.executor.extract_imports(path), number=3))
+
+    def bench_install(self):
+        """Yerel wheel indeksinden yükleme (toplu, tek tek ve dolu wheel deposundan)"""
+        from package_manager import PackageManager, Wheelhouse
+        index_dir = os.path.join(self.workdir, 'index')
+        os.makedirs(index_dir, exist_ok=True)
+        packages = [f'bench-dummy-{i}' for i in range(4)]
+        for package in packages:
+            make_wheel(index_dir, package, '1.0')
+
+        repeat = 1 if self.quick else 3
+        runs = iter(range(100))
+
+        def install(batch: bool, warm: bool):
+            run = next(runs)
+            target = os.path.join(self.workdir, f'target-{run}')
+            wheelhouse = os.path.join(self.workdir, 'wheelhouse' if warm else f'wheelhouse-{run}')
+            package_manager = PackageManager([target], index=index_dir,
+                                             wheelhouse=Wheelhouse(wheelhouse, index=index_dir))
+            with environ(PIP_TARGET=target, PIP_DISABLE_PIP_VERSION_CHECK='1'):
+                results = package_manager.install_packages(packages, batch=batch)
+            if not all(results.values()):
+                raise RuntimeError(f'Yükleme başarısız: {results}')
+
+        self.record(f'install.batch[{len(packages)}]', measure(lambda: install(True, False), repeat=repeat))
+        self.record(f'install.single[{len(packages)}]', measure(lambda: install(False, False), repeat=repeat))
+        install(True, True)  # wheel deposunu doldur
+        self.record(f'install.wheelhouse[{len(packages)}]', measure(lambda: install(True, True), repeat=repeat))
+
+    def bench_execute(self):
+        """execute_file gecikmesi ve farklı eşzamanlılıklarda verim"""
+        script = os.path.join(self.workdir, 'hello.py')
+        with open(script, 'w', encoding='utf-8') as f:
+            f.write('import json\nprint(json.dumps({"ok": True}))\n')
+
+        executor = self.executor
+        executor.execute_file(script)  # ısınma
+        self.record('execute.latency', measure(lambda: executor.execute_file(script),
+                                               repeat=10 if not self.quick else 3))
+
+        jobs = 8 if self.quick else 24
+        for concurrency in (1, 2, 4):
+            latencies = []
+            lock = threading.Lock()
+
+            def run_one(_):
+                started = time.perf_counter()
+                success, _, stderr = executor.execute_file(script)
+                if not success:
+                    raise RuntimeError(stderr)
+                with lock:
+                    latencies.append(time.perf_counter() - started)
+
+            started = time.perf_counter()
+            with ThreadPoolExecutor(concurrency) as pool:
+                list(pool.map(run_one, range(jobs)))
+            elapsed = time.perf_counter() - started
+            latencies.sort()
+            self.record(f'execute.throughput[c={concurrency}]', {
+                'seconds': elapsed / jobs,
+                'jobs_per_second': jobs / elapsed,
+                'p50_seconds': latencies[len(latencies) // 2],
+                'p95_seconds': latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))],
+                'jobs': jobs,
+            })
+
+    def bench_handlers(self):
+        """Sahte Update/CallbackContext ile bot handler'ları"""
+        try:
+            from bot import BotManager
+        except ImportError as e:
+            print(f"handlers atlandı: {e}")
+            return
+        from package_manager import PackageManager
+
+        # Telegram'a bağlanmadan ve arka plan işleri başlatmadan
+        bot = BotManager('benchmark', PackageManager(), executor=self.executor, connect=False)
+
+        handlers = {
+            'help': (bot.help_command, []),
+            'packages': (bot.list_packages, []),
+            'check': (bot.check_packages, []),
+            'status': (bot.status, []),
+        }
+        for name, (handler, args) in handlers.items():
+            self.record(f'handler.{name}',
+                        measure(lambda: handler(FakeUpdate(), FakeContext(args)), number=20))
+
+    BENCHMARKS = {
+        'index': bench_index,
+        'imports': bench_imports,
+        'install': bench_install,
+        'execute': bench_execute,
+        'handlers': bench_handlers,
+    }
+
+    def run(self, only: Optional[List[str]] = None):
+        for name, bench in self.BENCHMARKS.items():
+            if only and name not in only:
+                continue
+            bench(self)
+
+def compare(results: Dict[str, dict], baseline: Dict[str, dict], tolerance: float) -> List[str]:
+    """Referansa göre tolerans üstünde yavaşlayan benchmark'lar"""
+    regressions = []
+    print(f"\n{'benchmark':<40} {'referans':>12} {'şimdi':>12} {'oran':>8}")
+    for name, result in results.items():
+        reference = baseline.get(name)
+        if not reference:
+            print(f"{name:<40} {'-':>12} {result['seconds'] * 1000:>10.3f}ms {'yeni':>8}")
+            continue
+        ratio = result['seconds'] / reference['seconds'] if reference['seconds'] else 1.0
+        flag = ''
+        if ratio > 1 + tolerance:
+            flag = ' ⚠️'
+            regressions.append(name)
+        print(f"{name:<40} {reference['seconds'] * 1000:>10.3f}ms "
+              f"{result['seconds'] * 1000:>10.3f}ms {ratio:>7.2f}x{flag}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--only', nargs='*', choices=list(BenchmarkSuite.BENCHMARKS),
+                        help='Sadece seçilen benchmark grupları')
+    parser.add_argument('--output', help='Sonuçların yazılacağı JSON dosyası')
+    parser.add_argument('--baseline', help='Referans sonuç dosyası (varsayılan: moda göre '
+                                           'benchmark_baseline.json / benchmark_baseline.quick.json)')
+    parser.add_argument('--save-baseline', action='store_true', help='Sonuçları referans olarak kaydet')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='İzin verilen yavaşlama oranı (varsayılan: 0.25 = %%25)')
+    parser.add_argument('--quick', action='store_true', help='Daha küçük veri ve daha az tekrar')
+    args = parser.parse_args()
+    args.baseline = args.baseline or (QUICK_BASELINE_PATH if args.quick else BASELINE_PATH)
+
+    workdir = tempfile.mkdtemp(prefix='bot-benchmark-')
+    # Proje modülleri import edilmeden önce: önbellekler geçici dizine yazılsın
+    os.environ.setdefault('BOT_CACHE_DIR', os.path.join(workdir, 'cache'))
+    os.environ.setdefault('WORKER_PRELOAD', '')
+    random.seed(SEED)
+
+    suite = BenchmarkSuite(workdir, quick=args.quick)
+    try:
+        suite.run(args.only)
+    finally:
+        suite.close()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        'meta': {
+            'python': platform.python_version(),
+            'implementation': platform.python_implementation(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'quick': args.quick,
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'results': suite.results,
+    }
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nReferans kaydedildi: {args.baseline}")
+        return
+
+    # Referans olmadan yavaşlama tespit edilemez; CI'da fark edilsin
+    if not os.path.exists(args.baseline):
+        print(f"\n❌ Referans bulunamadı ({args.baseline}), önce --save-baseline ile oluşturun")
+        sys.exit(2)
+    with open(args.baseline, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+    if baseline['meta'].get('quick') != args.quick:
+        print("\n❌ Referans farklı modda (--quick) alınmış, oranlar karşılaştırılabilir değil")
+        sys.exit(2)
+    # Süreler makineye bağlıdır; başka bir ortamda alınmış referansla oran anlamsızdır
+    mismatched = [key for key in MACHINE_KEYS if baseline['meta'].get(key) != report['meta'][key]]
+    if mismatched:
+        for key in mismatched:
+            print(f"\n❌ Referans farklı bir ortamda alınmış ({key}: {baseline['meta'].get(key)} != {report['meta'][key]})")
+        print("Bu makinede --save-baseline ile yeni referans alın")
+        sys.exit(2)
+    regressions = compare(suite.results, baseline['results'], args.tolerance)
+    if regressions:
+        print(f"\n❌ {len(regressions)} benchmark %{args.tolerance * 100:.0f} üzerinde yavaşladı")
+        sys.exit(1)
+    print("\n✅ Yavaşlama yok")
+
+if __name__ == '__main__':
+    main()
@@ -1,46 +1,190 @@
 import os
+import time
+import queue
+import signal
+import hashlib
 import logging
-from telegram import Update, ParseMode
-from telegram.ext import Updater, CommandHandler, MessageHandler, Filters, CallbackContext
-from package_manager import PackageManager
+import platform
+import threading
+from typing import Optional
+from telegram import Update, ParseMode, TelegramError, InlineKeyboardButton, InlineKeyboardMarkup
+from telegram.ext import Updater, CommandHandler, MessageHandler, CallbackQueryHandler, Filters, CallbackContext
+from package_manager import PackageManager, normalize_name
 from executor import PythonExecutor
+from scheduler import JobQueue, JobScheduler
+from outdated import OutdatedChecker
+from dependency_graph import DependencyGraph
+from rate_limit import RateLimiter, parse_rate
+from staging import UploadStaging
+from metrics import REGISTRY, start_http_server
+import config
 
 logger = logging.getLogger(__name__)
 
+# Telegram callback_data en fazla 64 bayt olabilir; arama sayfa bilgisiyle birlikte sığmalı (bayt)
+PACKAGE_QUERY_LIMIT = 40
+
+# Dosya açıklaması bunlardan biriyse sonuç önbelleği kullanılmaz
+FRESH_CAPTIONS = ('--fresh', 'fresh')
+
 class BotManager:
-    def __init__(self, token: str, package_manager: PackageManager):
+    def __init__(self, token: str, package_manager: PackageManager,
+                 executor: Optional[PythonExecutor] = None, connect: bool = True):
+        """connect=False ise Telegram'a bağlanılmaz ve arka plan işleri başlatılmaz (benchmark için)"""
         self.token = token
         self.package_manager = package_manager
-        self.executor = PythonExecutor(package_manager)
-        self.updater = Updater(token=token, use_context=True)
-        self.setup_handlers()
+        self.executor = executor or PythonExecutor(package_manager)
+        self.scheduler = JobScheduler()
+        self.outdated = OutdatedChecker(package_manager)
+        if connect:
+            self.scheduler.start()
+            self.outdated.start(config.OUTDATED_START_DELAY)
+            package_manager.wheelhouse.start_prefetch(config.PREFETCH_PACKAGES, config.PREFETCH_DELAY)
+        self.dependencies = DependencyGraph(package_manager)
+        self.staging = UploadStaging()
+        self.rate_limiter = RateLimiter({
+            'install': parse_rate(config.RATE_LIMIT_INSTALL),
+            'exec': parse_rate(config.RATE_LIMIT_EXEC),
+            'query': parse_rate(config.RATE_LIMIT_QUERY),
+        })
+        # Kuyruk adı -> yeni iş kabul edilmeyecek bekleyen iş sayısı
+        self.admission = {
+            self.scheduler.installs.name: config.ADMISSION_INSTALL_BACKLOG,
+            self.scheduler.executions.name: config.ADMISSION_EXEC_BACKLOG,
+        }
+        self.updater = None
+        if connect:
+            self.updater = Updater(token=token, use_context=True, workers=config.UPDATE_WORKERS)
+            self.setup_handlers()
         
     def setup_handlers(self):
         """Bot komutlarını ayarla"""
         dp = self.updater.dispatcher
         
-        # Komutlar
-        dp.add_handler(CommandHandler("start", self.start_command))
-        dp.add_handler(CommandHandler("help", self.help_command))
-        dp.add_handler(CommandHandler("packages", self.list_packages))
-        dp.add_handler(CommandHandler("install", self.install_package))
-        dp.add_handler(CommandHandler("uninstall", self.uninstall_package))
-        dp.add_handler(CommandHandler("update", self.update_package))
-        dp.add_handler(CommandHandler("check", self.check_packages))
-        dp.add_handler(CommandHandler("status", self.status))
+        # Komutlar (komut sınıfı: kullanıcı başına istek sınırı). Handler'lar dispatcher
+        # thread'ini bekletmeden UPDATE_WORKERS thread'inde eşzamanlı çalışır
+        dp.add_handler(CommandHandler("start", self.guarded("start", "query", self.start_command), run_async=True))
+        dp.add_handler(CommandHandler("help", self.guarded("help", "query", self.help_command), run_async=True))
+        dp.add_handler(CommandHandler("packages", self.guarded("packages", "query", self.list_packages), run_async=True))
+        dp.add_handler(CallbackQueryHandler(self.guarded("packages_page", "query", self.packages_page), pattern=r'^pkgs:', run_async=True))
+        dp.add_handler(CommandHandler("install", self.guarded("install", "install", self.install_package), run_async=True))
+        dp.add_handler(CommandHandler("uninstall", self.guarded("uninstall", "install", self.uninstall_package), run_async=True))
+        dp.add_handler(CommandHandler("update", self.guarded("update", "install", self.update_package), run_async=True))
+        dp.add_handler(CommandHandler("check", self.guarded("check", "query", self.check_packages), run_async=True))
+        dp.add_handler(CommandHandler("status", self.guarded("status", "query", self.status), run_async=True))
         
         # Python dosyası çalıştırma
-        dp.add_handler(MessageHandler(Filters.document.py, self.execute_python_file))
+        dp.add_handler(MessageHandler(Filters.document.py, self.guarded("file", "exec", self.execute_python_file), run_async=True))
         
         # Hata yakalama
-        dp.add_error_handler(self.error_handler)
+        dp.add_error_handler(self.error_handler, run_async=True)
+        
+    def guarded(self, name: str, command_class: str, handler):
+        """Handler'ı istek sınırından geçiren ve süresini metriklere kaydeden sarmalayıcı
+
+        Sınır, handler dosya indirmeden veya iş kuyruğa eklenmeden önce uygulanır.
+        """
+        def wrapper(update: Update, context: CallbackContext):
+            with REGISTRY.timer('handler_duration_seconds', "Komut handler süreleri", handler=name):
+                wait = self.rate_limiter.check(self._user_id(update), command_class)
+                if wait:
+                    self._reply(update, f"🐢 Çok sık istek gönderdiniz, {int(wait) + 1} sn sonra tekrar deneyin.")
+                    return None
+                return handler(update, context)
+        return wrapper
+        
+    @staticmethod
+    def _user_id(update: Update):
+        user = update.effective_user
+        return user.id if user else update.effective_chat.id
+        
+    @staticmethod
+    def _reply(update: Update, text: str):
+        """Mesaja veya inline buton sorgusuna kısa yanıt ver"""
+        if update.callback_query:
+            update.callback_query.answer(text)
+        else:
+            update.message.reply_text(text)
         
     def start(self):
         """Bot'u başlat"""
         logger.info("🚀 Bot başlatılıyor...")
+        if config.METRICS_PORT:
+            start_http_server(config.METRICS_PORT, config.METRICS_HOST)
+            
+        if self.use_webhook():
+            try:
+                self.start_webhook()
+                return
+            except Exception as e:
+                logger.error(f"❌ Webhook başlatılamadı, polling'e geçiliyor: {e}")
+                
         self.updater.start_polling()
         self.updater.idle()
         
+    @staticmethod
+    def use_webhook() -> bool:
+        """auto modunda dışarıdan erişilen adres biliniyorsa webhook kullanılır"""
+        if config.BOT_MODE == 'auto':
+            return bool(config.WEBHOOK_URL)
+        return config.BOT_MODE == 'webhook'
+        
+    def start_webhook(self):
+        """Güncellemeleri dahili HTTP sunucusundan alıp dispatcher'a ver"""
+        from webhook import WebhookServer
+        
+        dispatcher = self.updater.dispatcher
+        secret_path = config.WEBHOOK_SECRET_PATH or hashlib.sha256(self.token.encode()).hexdigest()[:32]
+        
+        def on_update(data: dict):
+            dispatcher.update_queue.put(Update.de_json(data, self.updater.bot))
+            
+        server = WebhookServer(secret_path, on_update, self.scheduler, dispatcher.update_queue,
+                               config.WEBHOOK_LISTEN, config.PORT, self.admission)
+        if config.WEBHOOK_URL:
+            try:
+                self.updater.bot.set_webhook(url=f"{config.WEBHOOK_URL.rstrip('/')}/{secret_path}")
+            except Exception:
+                server.shutdown()
+                raise
+                
+        threading.Thread(target=dispatcher.start, name='dispatcher', daemon=True).start()
+        server.start()
+        
+        stop = threading.Event()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, lambda *_: stop.set())
+        while not stop.wait(1):
+            pass
+            
+        logger.info("👋 Webhook sunucusu kapatılıyor")
+        server.shutdown()
+        dispatcher.stop()
+        
+    def admission_limit(self, name: str, capacity: int) -> int:
+        """Kuyrukta bekleyebilecek en fazla iş (yeni işlerin reddedildiği eşik)"""
+        return min(capacity, self.admission.get(name, capacity))
+        
+    def submit_job(self, job_queue: JobQueue, update: Update, job, *args):
+        """İşi kuyruğa ekle ve kullanıcıya sırasını bildir"""
+        user_id = self._user_id(update)
+        
+        # Birikmiş iş eşiği aşıldıysa herkesin gecikmesini artırmak yerine reddet
+        if job_queue.size >= self.admission_limit(job_queue.name, job_queue.maxsize):
+            REGISTRY.inc('rate_limited_total', help_text="Sınıra takılan istekler",
+                         command_class=job_queue.name, reason='backlog')
+            update.message.reply_text("🚦 Sistem şu an çok yoğun, lütfen birkaç dakika sonra tekrar deneyin.")
+            return
+            
+        try:
+            position = job_queue.submit(user_id, lambda: job(update, *args))
+        except queue.Full:
+            update.message.reply_text("🚦 Kuyruk dolu, lütfen biraz sonra tekrar deneyin.")
+            return
+            
+        if position:
+            update.message.reply_text(f"⏳ İşiniz sıraya alındı (sıra: {position})")
+        
     def start_command(self, update: Update, context: CallbackContext):
         """Start komutu"""
         welcome_message = """
@@ -53,7 +197,7 @@ Bu bot ile:
 ✅ Python dosyalarını çalıştırabilirsiniz
 
 **📋 Komutlar:**
-/packages - Yüklü paketleri listele
+/packages [arama] - Yüklü paketleri listele/ara
 /install [paket] - Yeni paket yükle
 /uninstall [paket] - Paket kaldır
 /update [paket] - Paket güncelle
@@ -75,45 +219,77 @@ Bu bot ile:
 • `/install pandas numpy` - Birden fazla paket yükler
 • `/uninstall requests` - Paket kaldırır
 • `/update requests` - Paketi günceller
-• `/packages` - Tüm paketleri listeler
+• `/packages` - Tüm paketleri sayfa sayfa listeler
+• `/packages num` - Adında `num` geçen paketleri arar
 • `/check` - Eksik paketleri kontrol eder
 
 **Dosya İşlemleri:**
 • `.py` dosyası gönderin - Otomatik çalıştırır
 • Gereken paketler otomatik yüklenir
+• Açıklamaya `--fresh` yazılırsa önbellekteki sonuç yerine yeniden çalıştırılır
 
 **Not:** Tüm işlemler otomatik olarak yapılır! 🚀
         """
         update.message.reply_text(help_text, parse_mode=ParseMode.MARKDOWN)
         
     def list_packages(self, update: Update, context: CallbackContext):
-        """Yüklü paketleri listele"""
+        """Yüklü paketleri listele (/packages [arama])"""
         try:
-            packages = self.package_manager.get_installed_packages()
-            
-            if not packages:
-                update.message.reply_text("📦 Hiç paket yüklü değil.")
-                return
-                
-            message = "📦 **Yüklü Paketler:**\n\n"
-            for pkg in packages[:20]:  # İlk 20 paket
-                message += f"• `{pkg}`\n"
-                
-            if len(packages) > 20:
-                message += f"\n...ve {len(packages) - 20} paket daha"
-                
-            update.message.reply_text(message, parse_mode=ParseMode.MARKDOWN)
+            query = ' '.join(context.args or []).replace('`', '')
+            query = query.encode()[:PACKAGE_QUERY_LIMIT].decode(errors='ignore')
+            text, keyboard = self._packages_page(query, 0)
+            update.message.reply_text(text, parse_mode=ParseMode.MARKDOWN, reply_markup=keyboard)
             
         except Exception as e:
             update.message.reply_text(f"❌ Hata: {str(e)}")
             
+    def packages_page(self, update: Update, context: CallbackContext):
+        """Paket listesinde sayfa değiştir (inline buton)"""
+        callback = update.callback_query
+        _, page, query = callback.data.split(':', 2)
+        text, keyboard = self._packages_page(query, int(page))
+        callback.answer()
+        try:
+            callback.edit_message_text(text, parse_mode=ParseMode.MARKDOWN, reply_markup=keyboard)
+        except TelegramError:
+            # Sayfa içeriği değişmediyse Telegram düzenlemeyi reddeder
+            pass
+            
+    def _packages_page(self, query: str, page: int):
+        """Paylaşılan paket görüntüsünden sayfa metni ve gezinme butonları"""
+        snapshot = self.package_manager.get_snapshot()
+        packages, page, pages, total = snapshot.page(query, page, config.PACKAGES_PAGE_SIZE)
+        
+        if not packages:
+            if query:
+                return f"🔍 `{query}` ile eşleşen paket yok.", None
+            return "📦 Hiç paket yüklü değil.", None
+            
+        if query:
+            message = f"🔍 **`{query}` için {total} paket:**\n\n"
+        else:
+            message = f"📦 **Yüklü Paketler ({total}):**\n\n"
+        for pkg in packages:
+            message += f"• `{pkg}`\n"
+        message += f"\nSayfa {page + 1}/{pages}"
+        
+        buttons = []
+        if page > 0:
+            buttons.append(InlineKeyboardButton("◀️ Önceki", callback_data=f"pkgs:{page - 1}:{query}"))
+        if page < pages - 1:
+            buttons.append(InlineKeyboardButton("Sonraki ▶️", callback_data=f"pkgs:{page + 1}:{query}"))
+        return message, InlineKeyboardMarkup([buttons]) if buttons else None
+            
     def install_package(self, update: Update, context: CallbackContext):
         """Paket yükle"""
         if not context.args:
             update.message.reply_text("⚠️ Lütfen yüklenecek paket adını girin.\nÖrnek: `/install requests`", parse_mode=ParseMode.MARKDOWN)
             return
             
-        packages = context.args
+        self.submit_job(self.scheduler.installs, update, self._install_job, context.args)
+        
+    def _install_job(self, update: Update, packages):
+        """Paket yükleme işi"""
         update.message.reply_text(f"📦 `{', '.join(packages)}` yükleniyor...", parse_mode=ParseMode.MARKDOWN)
         
         try:
@@ -144,6 +320,30 @@ Bu bot ile:
             return
             
         package = context.args[0]
+        try:
+            impact = self._uninstall_impact(package)
+            if impact:
+                update.message.reply_text(impact, parse_mode=ParseMode.MARKDOWN)
+        except Exception as e:
+            logger.warning(f"Bağımlılık analizi hatası: {e}")
+            
+        self.submit_job(self.scheduler.installs, update, self._uninstall_job, package)
+        
+    def _uninstall_impact(self, package: str) -> str:
+        """Kaldırmanın etkisi: bağımlı paketler ve sahipsiz kalacak bağımlılıklar"""
+        dependents = self.dependencies.reverse_dependencies(package)
+        orphans = self.dependencies.orphans_after_uninstall(package)
+        message = ""
+        if dependents:
+            message += f"⚠️ **`{package}` şu paketler tarafından kullanılıyor:**\n"
+            message += ''.join(f"• `{name}`\n" for name in dependents)
+        if orphans:
+            message += "\n🧹 **Kaldırıldıktan sonra kullanılmayacak bağımlılıklar:**\n"
+            message += ''.join(f"• `{name}`\n" for name in orphans)
+        return message
+        
+    def _uninstall_job(self, update: Update, package: str):
+        """Paket kaldırma işi"""
         update.message.reply_text(f"🗑️ `{package}` kaldırılıyor...", parse_mode=ParseMode.MARKDOWN)
         
         try:
@@ -161,11 +361,43 @@ Bu bot ile:
             return
             
         package = context.args[0]
+        try:
+            impact = self._update_impact(package)
+            if impact:
+                update.message.reply_text(impact, parse_mode=ParseMode.MARKDOWN)
+        except Exception as e:
+            logger.warning(f"Bağımlılık analizi hatası: {e}")
+            
+        self.submit_job(self.scheduler.installs, update, self._update_job, package)
+        
+    def _update_impact(self, package: str) -> str:
+        """Yükseltmeyi kısıtlayan bağımlı paketler (bilinen son sürüme göre)"""
+        latest = self.outdated.latest_version(package)
+        conflicts = self.dependencies.upgrade_conflicts(package, latest)
+        if not conflicts:
+            return ""
+        if latest:
+            message = f"⚠️ **`{package}` {latest} şu paketlerin kısıtlarıyla çakışıyor:**\n"
+        else:
+            message = f"⚠️ **`{package}` sürümünü sınırlayan paketler:**\n"
+        for conflict in conflicts:
+            message += f"• `{conflict.dependent}` → `{package}{conflict.specifier}`\n"
+        return message
+        
+    def _update_job(self, update: Update, package: str):
+        """Paket güncelleme işi"""
         update.message.reply_text(f"🔄 `{package}` güncelleniyor...", parse_mode=ParseMode.MARKDOWN)
         
         try:
             if self.package_manager.update_package(package):
                 update.message.reply_text(f"✅ `{package}` başarıyla güncellendi.", parse_mode=ParseMode.MARKDOWN)
+                broken = [problem for problem in self.dependencies.broken()
+                          if normalize_name(package) in (normalize_name(problem[0]), normalize_name(problem[1]))]
+                if broken:
+                    message = "⚠️ **Karşılanmayan gereksinimler:**\n"
+                    message += ''.join(f"• `{name}` → `{required}{specifier}`\n"
+                                       for name, required, specifier in broken)
+                    update.message.reply_text(message, parse_mode=ParseMode.MARKDOWN)
             else:
                 update.message.reply_text(f"❌ `{package}` güncellenemedi.", parse_mode=ParseMode.MARKDOWN)
         except Exception as e:
@@ -173,56 +405,135 @@ Bu bot ile:
             
     def check_packages(self, update: Update, context: CallbackContext):
         """Eksik paketleri kontrol et"""
-        update.message.reply_text("🔍 Eksik paketler kontrol ediliyor...")
-        
         try:
-            missing_packages = self.package_manager.check_missing_packages()
+            missing_packages = self.package_manager.get_missing_requirements()
+            outdated_packages, age = self.outdated.snapshot()
             
-            if not missing_packages:
-                update.message.reply_text("✅ Tüm paketler güncel ve yüklü!")
+            if outdated_packages is None:
+                outdated_packages = []
+                age_text = "⏳ Güncellik kontrolü henüz tamamlanmadı, birazdan tekrar deneyin."
+            else:
+                age_text = f"🕒 Son kontrol: {self._format_age(age)} önce"
+                
+            if not missing_packages and not outdated_packages:
+                update.message.reply_text(f"✅ Tüm paketler güncel ve yüklü!\n\n{age_text}")
                 return
                 
+            packages = missing_packages + outdated_packages
             message = "📦 **Eksik/Güncellenmesi Gereken Paketler:**\n\n"
-            for pkg in missing_packages[:10]:
+            for pkg in packages[:10]:
                 message += f"• `{pkg}`\n"
                 
-            if len(missing_packages) > 10:
-                message += f"\n...ve {len(missing_packages) - 10} paket daha"
+            if len(packages) > 10:
+                message += f"\n...ve {len(packages) - 10} paket daha"
                 
-            message += "\n\n📥 Yüklemek için: `/install paket_adi`"
+            message += f"\n\n📥 Yüklemek için: `/install paket_adi`\n{age_text}"
             update.message.reply_text(message, parse_mode=ParseMode.MARKDOWN)
             
         except Exception as e:
             update.message.reply_text(f"❌ Kontrol hatası: {str(e)}")
             
+    @staticmethod
+    def _format_age(seconds: float) -> str:
+        """Saniyeyi okunur süreye çevir"""
+        if seconds < 60:
+            return f"{int(seconds)} sn"
+        if seconds < 3600:
+            return f"{int(seconds // 60)} dk"
+        return f"{int(seconds // 3600)} sa"
+            
     def status(self, update: Update, context: CallbackContext):
-        """Bot durumu"""
-        status_text = """
+        """Bot durumu (alt süreç çalıştırmadan, bellekteki metriklerden)"""
+        REGISTRY.collect()
+        
+        message = f"""
 🟢 **Bot Durumu: Aktif**
 
 **Sistem Bilgileri:**
-• Paket Sayısı: {}
-• Python Versiyonu: {}
+• Paket Sayısı: {len(self.package_manager.get_installed_packages())}
+• Python Versiyonu: Python {platform.python_version()}
 • Bot Versiyonu: 1.0.0
-
-**Özellikler:**
-✅ Paket Yükleme
-✅ Paket Kaldırma
-✅ Paket Güncelleme
-✅ Python Dosyası Çalıştırma
-✅ Otomatik Bağımlılık Yönetimi
-        """
+"""
+        
+        message += "\n**Kuyruklar:**\n"
+        for name, stats in self.scheduler.stats().items():
+            limit = self.admission_limit(name, stats['capacity'])
+            message += (f"• {name}: {stats['running']}/{stats['workers']} çalışıyor, "
+                        f"{stats['queued']}/{limit} bekliyor\n")
+        
+        pip_durations = REGISTRY.histogram_summary('pip_duration_seconds')
+        if pip_durations:
+            message += "\n**pip:**\n"
+            for labels, (count, average, _) in sorted(pip_durations.items()):
+                command = dict(labels)['command']
+                failures = sum(REGISTRY.counter_value('pip_runs_total', command=command, result=result)
+                               for result in ('failure', 'timeout', 'error'))
+                message += f"• {command}: {count} çağrı, {failures} hatalı, ort. {average:.2f} sn\n"
+        
+        stages = REGISTRY.histogram_summary('execute_stage_seconds')
+        if stages:
+            message += "\n**Çalıştırma Aşamaları (ort.):**\n"
+            for labels, (count, average, _) in sorted(stages.items()):
+                message += f"• {dict(labels)['stage']}: {average:.3f} sn ({count})\n"
+        
+        hit_ratio = REGISTRY.gauge_value('cache_hit_ratio', cache='analysis')
+        if hit_ratio is not None:
+            message += f"\n**Analiz Önbelleği:** %{hit_ratio * 100:.0f} isabet\n"
+        result_ratio = REGISTRY.gauge_value('cache_hit_ratio', cache='result')
+        if result_ratio is not None:
+            message += f"**Sonuç Önbelleği:** %{result_ratio * 100:.0f} isabet\n"
+        
+        handlers = REGISTRY.histogram_summary('handler_duration_seconds')
+        if handlers:
+            message += "\n**Komut Süreleri (ort. / p95):**\n"
+            for labels, (count, average, p95) in sorted(handlers.items()):
+                message += f"• /{dict(labels)['handler']}: {average * 1000:.0f} ms / {p95 * 1000:.0f} ms ({count})\n"
         
-        package_count = len(self.package_manager.get_installed_packages())
-        python_version = os.popen('python --version').read().strip()
+        limited = {reason: sum(REGISTRY.counter_value('rate_limited_total', command_class=command_class, reason=reason)
+                               for command_class in ('install', 'exec', 'query'))
+                   for reason in ('user', 'backlog')}
+        if any(limited.values()):
+            message += (f"\n**Yük Kontrolü:** {int(limited['user'])} istek sınırı, "
+                        f"{int(limited['backlog'])} yoğunluk nedeniyle reddedildi\n")
         
-        update.message.reply_text(
-            status_text.format(package_count, python_version),
-            parse_mode=ParseMode.MARKDOWN
-        )
+        # İsteyen kullanıcının son çalıştırdığı dosyaların kaynak kullanımı (başkalarınınki gösterilmez)
+        user_id = self._user_id(update)
+        recent_jobs = [job for job in self.executor.recent_jobs if job[0] == user_id][-5:]
+        if recent_jobs:
+            message += "\n**Son İşleriniz:**\n"
+            for _, file_name, success, usage in reversed(recent_jobs):
+                icon = "✅" if success else "❌"
+                message += (f"{icon} `{file_name}` - CPU {usage.cpu_seconds:.2f} sn, "
+                            f"bellek {usage.peak_rss_mb:.0f} MB, süre {usage.wall_seconds:.2f} sn\n")
+        
+        update.message.reply_text(message, parse_mode=ParseMode.MARKDOWN)
         
     def execute_python_file(self, update: Update, context: CallbackContext):
         """Python dosyasını çalıştır"""
+        if self._reply_cached(update):
+            return
+        self.submit_job(self.scheduler.executions, update, self._execute_job)
+        
+    @staticmethod
+    def _wants_fresh(update: Update) -> bool:
+        """"--fresh" açıklamasıyla gönderilen dosyalarda sonuç önbelleği atlanır"""
+        return (update.message.caption or '').strip().lower() in FRESH_CAPTIONS
+        
+    def _reply_cached(self, update: Update) -> bool:
+        """Aynı içerik daha önce çalıştırıldıysa kuyruğa almadan önbellekteki sonucu gönder"""
+        document = update.message.document
+        if not document or not (document.file_name or '').endswith('.py') or self._wants_fresh(update):
+            return False
+        digest = self.staging.known_digest(document.file_unique_id)
+        result = self.executor.cached_result(digest) if digest else None
+        if result is None:
+            return False
+        logger.info(f"♻️ {document.file_name} sonucu önbellekten (kuyruğa alınmadan)")
+        update.message.reply_text(self._result_message(result), parse_mode=ParseMode.MARKDOWN)
+        return True
+        
+    def _execute_job(self, update: Update):
+        """Python dosyası çalıştırma işi"""
         try:
             file = update.message.document
             file_name = file.file_name
@@ -233,32 +544,68 @@ Bu bot ile:
                 
             update.message.reply_text(f"📁 `{file_name}` indiriliyor...", parse_mode=ParseMode.MARKDOWN)
             
-            # Dosyayı indir
-            file_path = f"/tmp/{file_name}"
-            file.get_file().download(custom_path=file_path)
-            
-            update.message.reply_text("🔍 Python dosyası analiz ediliyor...")
-            
-            # Dosyayı çalıştır
-            success, output, error = self.executor.execute_file(file_path)
-            
-            if success:
-                message = f"✅ **Dosya başarıyla çalıştırıldı!**\n\n📤 **Çıktı:**\n```\n{output[:3000]}\n```"
-                if len(output) > 3000:
-                    message += "\n\n... (çıktı çok uzun, ilk 3000 karakter gösteriliyor)"
-            else:
-                message = f"❌ **Çalıştırma hatası!**\n\n```\n{error[:3000]}\n```"
+            # Dosyayı içerik özetiyle sakla (aynı dosya bir kez indirilir), işe özel dizine kopyala
+            staged = self.staging.stage(file)
+            try:
+                self._run_staged(update, file_name, staged.path)
+            finally:
+                self.staging.release(staged)
                 
-            update.message.reply_text(message, parse_mode=ParseMode.MARKDOWN)
-            
-            # Geçici dosyayı temizle
-            os.remove(file_path)
-            
         except Exception as e:
             update.message.reply_text(f"❌ Dosya işleme hatası: {str(e)}")
             
+    def _run_staged(self, update: Update, file_name: str, file_path: str):
+        """Hazırlanan dosyayı çalıştırıp sonucu gönder"""
+        progress = update.message.reply_text("🔍 Python dosyası analiz ediliyor...")
+        last_edit = [time.monotonic()]
+        
+        def show_progress(collector):
+            """Çıktının son kısmını belirli aralıklarla aynı mesajda göster"""
+            now = time.monotonic()
+            if now - last_edit[0] < config.OUTPUT_EDIT_INTERVAL or not collector.tail('stdout'):
+                return
+            last_edit[0] = now
+            progress.edit_text(
+                f"⏳ **Çalışıyor...**\n\n```\n{collector.tail('stdout')[-3000:]}\n```",
+                parse_mode=ParseMode.MARKDOWN
+            )
+        
+        # Dosyayı çalıştır
+        result = self.executor.run_file(file_path, on_output=show_progress,
+                                        use_cache=not self._wants_fresh(update), owner=self._user_id(update))
+        
+        try:
+            message = self._result_message(result)
+            try:
+                progress.edit_text(message, parse_mode=ParseMode.MARKDOWN)
+            except TelegramError:
+                update.message.reply_text(message, parse_mode=ParseMode.MARKDOWN)
+                
+            # Mesaja sığmayan çıktının tamamını dosya olarak gönder
+            if result.output_file:
+                with open(result.output_file, 'rb') as f:
+                    update.message.reply_document(f, filename=f"{file_name}.output.txt")
+        finally:
+            if result.output_file:
+                os.remove(result.output_file)
+            
+    @staticmethod
+    def _result_message(result) -> str:
+        """Çalıştırma sonucunu mesaja çevir"""
+        if not result.success:
+            return f"❌ **Çalıştırma hatası!**\n\n```\n{result.stderr[-3000:]}\n```"
+        message = f"✅ **Dosya başarıyla çalıştırıldı!**\n\n📤 **Çıktı:**\n```\n{result.stdout[-3000:]}\n```"
+        if result.cached:
+            message = ("♻️ **Önbellekten** (yeniden çalıştırmak için dosyayı `--fresh` "
+                       f"açıklamasıyla gönderin)\n\n{message}")
+        if result.output_file:
+            message += "\n\n... (çıktı çok uzun, son 3000 karakter gösteriliyor, tamamı dosyada)"
+        return message
+            
     def error_handler(self, update: Update, context: CallbackContext):
         """Hata yakalayıcı"""
         logger.error(f"Update {update} caused error {context.error}")
-        if update:
-            update.message.reply_text("❌ Bir hata oluştu. Lütfen tekrar deneyin.")
+        # Buton (callback query) güncellemelerinde update.message yoktur
+        message = update.effective_message if isinstance(update, Update) else None
+        if message:
+            message.reply_text("❌ Bir hata oluştu. Lütfen tekrar deneyin.")
@@ -0,0 +1,144 @@
+import json
+import time
+import atexit
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Optional
+from fileutil import write_json_atomic
+
+logger = logging.getLogger(__name__)
+
+class LRUCache:
+    """Eleman sayısı/boyut sınırlı, isteğe bağlı TTL ve disk kalıcılığı olan LRU önbellek
+
+    Değerler JSON'a çevrilebilir olmalıdır. Disk kalıcılığı açıksa değişiklikler
+    save_delay saniye biriktirilip arka planda, kilit dışında tek seferde yazılır;
+    kalanlar çıkışta yazılır.
+    """
+
+    def __init__(self, max_entries: int = 256, max_bytes: Optional[int] = None,
+                 ttl: Optional[float] = None, path: Optional[str] = None,
+                 save_delay: float = 5.0):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.path = path
+        self.save_delay = save_delay
+        self.hits = 0
+        self.misses = 0
+        # anahtar -> (değer, boyut, oluşturulma zamanı)
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        # Diske yazma sırası ve bekleyen yazma
+        self._save_lock = threading.Lock()
+        self._dirty = False
+        self._timer: Optional[threading.Timer] = None
+        if path:
+            self._load()
+            atexit.register(self.flush)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def size_bytes(self) -> int:
+        return self._bytes
+
+    def _expired(self, created_at: float) -> bool:
+        return self.ttl is not None and time.time() - created_at > self.ttl
+
+    def get(self, key: str) -> Optional[Any]:
+        """Değeri döndür ve en son kullanılan yap; yoksa veya süresi dolduysa None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or self._expired(entry[2]):
+                if entry is not None:
+                    self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, key: str, value: Any, size: Optional[int] = None):
+        """Değeri ekle, sınırlar aşılırsa en eski kullanılanları at"""
+        if size is None:
+            size = len(json.dumps(value))
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            if self.max_bytes is not None and size > self.max_bytes:
+                return
+            self._entries[key] = (value, size, time.time())
+            self._bytes += size
+            while len(self._entries) > self.max_entries or \
+                    (self.max_bytes is not None and self._bytes > self.max_bytes):
+                self._remove(next(iter(self._entries)))
+            self._schedule_save()
+
+    def delete(self, key: str):
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+                self._schedule_save()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self._schedule_save()
+
+    def _remove(self, key: str):
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    def _load(self):
+        """Diskteki önbelleği yükle (eskiden yeniye sıralı)"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                entries = json.load(f)
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            logger.warning(f"Önbellek okunamadı ({self.path}): {e}")
+            return
+
+        for key, value, size, created_at in entries:
+            if not self._expired(created_at):
+                self._entries[key] = (value, size, created_at)
+                self._bytes += size
+        while len(self._entries) > self.max_entries or \
+                (self.max_bytes is not None and self._bytes > self.max_bytes):
+            self._remove(next(iter(self._entries)))
+
+    def _schedule_save(self):
+        """Değişikliği işaretle, bekleyen yazma yoksa gecikmeli yazma başlat (_lock altında çağrılır)"""
+        if not self.path:
+            return
+        self._dirty = True
+        if self._timer is None:
+            self._timer = threading.Timer(self.save_delay, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self):
+        """Bekleyen değişiklikleri diske yaz"""
+        with self._save_lock:
+            with self._lock:
+                self._timer = None
+                if not self._dirty:
+                    return
+                self._dirty = False
+                # Değerler değiştirilmeden saklandığı için sığ kopya yeterli
+                entries = [[key, value, size, created_at]
+                           for key, (value, size, created_at) in self._entries.items()]
+            self._save(entries)
+
+    def _save(self, entries: list):
+        """Önbelleği diske atomik olarak yaz"""
+        try:
+            write_json_atomic(self.path, entries)
+        except Exception as e:
+            logger.warning(f"Önbellek yazılamadı ({self.path}): {e}")
@@ -0,0 +1,94 @@
+import os
+
+# Önbellek ve yerel depolama dizini
+CACHE_DIR = os.environ.get(
+    'BOT_CACHE_DIR',
+    os.path.join(os.path.expanduser('~'), '.cache', 'telegram-python-bot')
+)
+
+# Isınmış yorumlayıcı havuzu (0 = kapalı, her dosya yeni süreçte çalışır)
+WORKER_POOL_SIZE = int(os.environ.get('WORKER_POOL_SIZE', '2'))
+# Worker'ların önceden import edeceği modüller (virgülle ayrılmış)
+WORKER_PRELOAD = [name.strip() for name in
+                  os.environ.get('WORKER_PRELOAD', 'numpy,pandas,requests').split(',')
+                  if name.strip()]
+# Bir worker kaç işten sonra yenilensin
+WORKER_MAX_JOBS = int(os.environ.get('WORKER_MAX_JOBS', '50'))
+
+# İş kuyrukları: paket işlemleri tek sıra, script'ler çekirdek sayısı kadar paralel
+INSTALL_QUEUE_SIZE = int(os.environ.get('INSTALL_QUEUE_SIZE', '20'))
+EXEC_QUEUE_SIZE = int(os.environ.get('EXEC_QUEUE_SIZE', '20'))
+EXEC_WORKERS = int(os.environ.get('EXEC_WORKERS', str(os.cpu_count() or 1)))
+
+# Paket indeksi: boş = PyPI, dizin = yerel (--find-links), diğer = --index-url
+PACKAGE_INDEX = os.environ.get('PACKAGE_INDEX', '')
+# Tüm pip kurulumlarının önce baktığı kalıcı wheel deposu (indirilen/derlenen her wheel saklanır)
+WHEELHOUSE_DIR = os.environ.get('WHEELHOUSE_DIR', os.path.join(CACHE_DIR, 'wheelhouse'))
+# Arka planda önceden indirilip derlenecek popüler paketler (virgülle ayrılmış)
+PREFETCH_PACKAGES = [name.strip() for name in
+                     os.environ.get('PREFETCH_PACKAGES', 'numpy,pandas,requests,matplotlib').split(',')
+                     if name.strip()]
+PREFETCH_DELAY = float(os.environ.get('PREFETCH_DELAY', '60'))
+# Güncel olmayan paket görüntüsünün geçerlilik süresi ve kontrol aralığı (saniye)
+OUTDATED_TTL = float(os.environ.get('OUTDATED_TTL', '3600'))
+OUTDATED_POLL_INTERVAL = float(os.environ.get('OUTDATED_POLL_INTERVAL', '30'))
+OUTDATED_TIMEOUT = float(os.environ.get('OUTDATED_TIMEOUT', '600'))
+# İlk tam kontrolden önce beklenecek süre (açılışta PyPI sorgusu başlangıcı yavaşlatmasın)
+OUTDATED_START_DELAY = float(os.environ.get('OUTDATED_START_DELAY', '60'))
+
+# Script analiz önbelleği (içerik özetine göre import'lar ve bağımlılık durumu)
+ANALYSIS_CACHE_SIZE = int(os.environ.get('ANALYSIS_CACHE_SIZE', '256'))
+ANALYSIS_CACHE_PERSIST = os.environ.get('ANALYSIS_CACHE_PERSIST', '0') == '1'
+
+# Script çıktısı: bellekte tutulan son karakter sayısı, diske yazılacak en fazla bayt
+# ve çalışırken mesajın güncellenme aralığı (saniye)
+OUTPUT_TAIL_CHARS = int(os.environ.get('OUTPUT_TAIL_CHARS', '3000'))
+OUTPUT_SPOOL_LIMIT = int(os.environ.get('OUTPUT_SPOOL_LIMIT', str(10 * 1024 * 1024)))
+OUTPUT_EDIT_INTERVAL = float(os.environ.get('OUTPUT_EDIT_INTERVAL', '3'))
+
+# Script bağımlılıklarını paylaşılan wheel deposundan kurulan izole ortamlarda çalıştır
+ISOLATED_ENVS = os.environ.get('ISOLATED_ENVS', '1') == '1'
+
+# Script başına kaynak sınırları (0 = sınırsız). LIMIT_PROCESSES kullanıcı başına
+# sayıldığından botla aynı kullanıcıda çalışırken dikkatli seçilmelidir.
+LIMIT_CPU_SECONDS = int(os.environ.get('LIMIT_CPU_SECONDS', '60'))
+LIMIT_MEMORY_MB = int(os.environ.get('LIMIT_MEMORY_MB', '2048'))
+LIMIT_OPEN_FILES = int(os.environ.get('LIMIT_OPEN_FILES', '256'))
+LIMIT_PROCESSES = int(os.environ.get('LIMIT_PROCESSES', '0'))
+
+# Prometheus /metrics uç noktası (0 = kapalı); varsayılan olarak sadece yerel erişim
+METRICS_PORT = int(os.environ.get('METRICS_PORT', '0'))
+METRICS_HOST = os.environ.get('METRICS_HOST', '127.0.0.1')
+
+# Güncelleme alma: auto = WEBHOOK_URL varsa webhook, yoksa polling; webhook; polling
+BOT_MODE = os.environ.get('BOT_MODE', 'auto').lower()
+# Telegram'ın webhook göndereceği dış adres (Render bunu RENDER_EXTERNAL_URL olarak verir)
+WEBHOOK_URL = os.environ.get('WEBHOOK_URL', os.environ.get('RENDER_EXTERNAL_URL', ''))
+# Webhook'un gizli yolu; boşsa token'dan türetilir
+WEBHOOK_SECRET_PATH = os.environ.get('WEBHOOK_SECRET_PATH', '')
+WEBHOOK_LISTEN = os.environ.get('WEBHOOK_LISTEN', '0.0.0.0')
+PORT = int(os.environ.get('PORT', '8080'))
+# Handler'ları eşzamanlı (run_async) çalıştıran thread sayısı
+UPDATE_WORKERS = int(os.environ.get('UPDATE_WORKERS', '4'))
+
+# /packages sayfa başına gösterilen paket sayısı
+PACKAGES_PAGE_SIZE = int(os.environ.get('PACKAGES_PAGE_SIZE', '20'))
+
+# Script sonuç önbelleği (isteğe bağlı): aynı içerik ve aynı yüklü paketlerle tekrar
+# gönderilen script çalıştırılmadan önceki çıktısıyla yanıtlanır
+RESULT_CACHE = os.environ.get('RESULT_CACHE', '0') == '1'
+RESULT_CACHE_MAX_BYTES = int(os.environ.get('RESULT_CACHE_MAX_BYTES', str(16 * 1024 * 1024)))
+RESULT_CACHE_TTL = float(os.environ.get('RESULT_CACHE_TTL', '3600'))
+RESULT_CACHE_PERSIST = os.environ.get('RESULT_CACHE_PERSIST', '0') == '1'
+
+# Kullanıcı başına istek sınırları ("istek/saniye", boş veya 0 = sınırsız)
+RATE_LIMIT_INSTALL = os.environ.get('RATE_LIMIT_INSTALL', '5/60')
+RATE_LIMIT_EXEC = os.environ.get('RATE_LIMIT_EXEC', '10/60')
+RATE_LIMIT_QUERY = os.environ.get('RATE_LIMIT_QUERY', '30/60')
+# Kuyrukta bu kadar iş birikince yeni işler kabul edilmez (kapasiteden önce yük atma)
+ADMISSION_INSTALL_BACKLOG = int(os.environ.get('ADMISSION_INSTALL_BACKLOG', '10'))
+ADMISSION_EXEC_BACKLOG = int(os.environ.get('ADMISSION_EXEC_BACKLOG', '15'))
+
+# Yüklenen script'ler: içerik özetine göre saklandığı dizin ve kullanılmayanların silinme süresi (saniye)
+UPLOAD_DIR = os.environ.get('UPLOAD_DIR', os.path.join(CACHE_DIR, 'uploads'))
+UPLOAD_TTL = float(os.environ.get('UPLOAD_TTL', '3600'))
@@ -0,0 +1,189 @@
+import re
+import logging
+import threading
+from importlib import metadata
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple
+from package_manager import PackageManager, normalize_name
+
+try:
+    from packaging.requirements import Requirement
+    from packaging.specifiers import SpecifierSet
+except ImportError:
+    Requirement = None
+    SpecifierSet = None
+
+logger = logging.getLogger(__name__)
+
+# Üst sınır koyan operatörler: yeni sürümü bilmeden yükseltmeyi engelleyebilirler
+_UPPER_BOUND = re.compile(r'(===|==|<=|<|~=)')
+
+class Dependency(NamedTuple):
+    # Gereken paketin normalize adı
+    key: str
+    # Sürüm kısıtı (ör. ">=1.0,<2"), yoksa boş
+    specifier: str
+
+class Conflict(NamedTuple):
+    # Kısıtı koyan paket
+    dependent: str
+    specifier: str
+    # Yeni sürüm kısıtı sağlamıyorsa False, sürüm bilinmiyorsa None
+    satisfied: Optional[bool]
+
+def parse_requirement(line: str) -> Optional[Dependency]:
+    """Requires-Dist satırını (ad, kısıt) olarak çöz; extra'ya bağlı veya bu ortama uymayanlar None"""
+    if Requirement is not None:
+        try:
+            requirement = Requirement(line)
+        except Exception:
+            return None
+        if requirement.marker is not None:
+            try:
+                if not requirement.marker.evaluate({'extra': ''}):
+                    return None
+            except Exception:
+                return None
+        return Dependency(normalize_name(requirement.name), str(requirement.specifier))
+
+    # packaging yoksa: extra koşullu gereksinimler atlanır, diğer işaretler yok sayılır
+    requirement, _, marker = line.partition(';')
+    if 'extra' in marker:
+        return None
+    match = re.match(r'\s*([A-Za-z0-9][A-Za-z0-9._-]*)\s*(\[[^\]]*\])?\s*\(?([^)]*)\)?', requirement)
+    if not match:
+        return None
+    return Dependency(normalize_name(match.group(1)), match.group(3).replace(' ', ''))
+
+def satisfies(specifier: str, version: str) -> Optional[bool]:
+    """Sürüm kısıtı sağlıyor mu; packaging yoksa ve kısıt üst sınır içeriyorsa None"""
+    if not specifier:
+        return True
+    if SpecifierSet is not None:
+        try:
+            return SpecifierSet(specifier).contains(version, prereleases=True)
+        except Exception:
+            return None
+    return None if _UPPER_BOUND.search(specifier) else True
+
+class DependencyGraph:
+    """Yüklü paketlerin metadata'sından kurulan bağımlılık grafiği (pipdeptree benzeri)
+
+    İlk sorguda bir kez kurulur; yüklü küme değiştiğinde sadece eklenen,
+    kaldırılan veya sürümü değişen paketlerin Requires-Dist bilgisi okunur.
+    """
+
+    def __init__(self, package_manager: PackageManager):
+        self.package_manager = package_manager
+        # normalize ad -> (proje adı, versiyon, bağımlılıklar)
+        self._nodes: Dict[str, Tuple[str, str, List[Dependency]]] = {}
+        # normalize ad -> ona bağımlı paketler
+        self._reverse: Dict[str, Set[str]] = {}
+        self._version: Optional[str] = None
+        self._lock = threading.RLock()
+
+    def refresh(self):
+        """Yüklü küme değiştiyse grafiği artımlı olarak güncelle"""
+        version = self.package_manager.index_version
+        if version == self._version:
+            return
+        with self._lock:
+            if version == self._version:
+                return
+            installed = self.package_manager.installed_distributions()
+            removed = [key for key in self._nodes if key not in installed]
+            changed = [key for key, (_, dist_version, _) in installed.items()
+                       if key not in self._nodes or self._nodes[key][1] != dist_version]
+
+            for key in removed + changed:
+                if key in self._nodes:
+                    for dependency in self._nodes.pop(key)[2]:
+                        self._reverse.get(dependency.key, set()).discard(key)
+            for key in changed:
+                name, dist_version, location = installed[key]
+                dependencies = self._read_dependencies(location)
+                self._nodes[key] = (name, dist_version, dependencies)
+                for dependency in dependencies:
+                    self._reverse.setdefault(dependency.key, set()).add(key)
+
+            self._version = version
+            if removed or changed:
+                logger.debug(f"Bağımlılık grafiği güncellendi: +{len(changed)} -{len(removed)}")
+
+    @staticmethod
+    def _read_dependencies(location: str) -> List[Dependency]:
+        """Dağıtımın koşulsuz (extra'sız) bağımlılıkları"""
+        try:
+            requires = metadata.PathDistribution.at(location).requires or []
+        except Exception as e:
+            logger.debug(f"Bağımlılıklar okunamadı ({location}): {e}")
+            return []
+        dependencies = {}
+        for line in requires:
+            dependency = parse_requirement(line)
+            if dependency and dependency.key not in dependencies:
+                dependencies[dependency.key] = dependency
+        return list(dependencies.values())
+
+    def _name(self, key: str) -> str:
+        node = self._nodes.get(key)
+        return node[0] if node else key
+
+    def dependencies(self, package: str) -> List[Dependency]:
+        """Paketin doğrudan bağımlılıkları"""
+        self.refresh()
+        node = self._nodes.get(normalize_name(package))
+        return list(node[2]) if node else []
+
+    def reverse_dependencies(self, package: str) -> List[str]:
+        """Pakete doğrudan bağımlı olan yüklü paketler"""
+        self.refresh()
+        with self._lock:
+            return sorted(self._name(key) for key in self._reverse.get(normalize_name(package), ()))
+
+    def orphans_after_uninstall(self, package: str) -> List[str]:
+        """Paket kaldırılınca başka hiçbir paketin ihtiyaç duymayacağı bağımlılıkları"""
+        self.refresh()
+        with self._lock:
+            removed = {normalize_name(package)}
+            pending = [dependency.key for dependency in self._nodes.get(normalize_name(package), ('', '', []))[2]]
+            orphans = []
+            while pending:
+                key = pending.pop()
+                if key in removed or key not in self._nodes:
+                    continue
+                if self._reverse.get(key, set()) <= removed:
+                    removed.add(key)
+                    orphans.append(self._name(key))
+                    pending.extend(dependency.key for dependency in self._nodes[key][2])
+            return sorted(orphans)
+
+    def upgrade_conflicts(self, package: str, version: Optional[str] = None) -> List[Conflict]:
+        """Yükseltmeyi kısıtlayan bağımlı paketler
+
+        Hedef sürüm verilirse kısıtı sağlamayanlar, verilmezse üst sınır koyanlar döner.
+        """
+        self.refresh()
+        key = normalize_name(package)
+        conflicts = []
+        with self._lock:
+            for dependent in sorted(self._reverse.get(key, ())):
+                specifier = next((d.specifier for d in self._nodes[dependent][2] if d.key == key), '')
+                if version is not None:
+                    satisfied = satisfies(specifier, version)
+                    if satisfied is not True:
+                        conflicts.append(Conflict(self._name(dependent), specifier, satisfied))
+                elif _UPPER_BOUND.search(specifier):
+                    conflicts.append(Conflict(self._name(dependent), specifier, None))
+        return conflicts
+
+    def broken(self) -> List[Tuple[str, str, str]]:
+        """Karşılanmayan gereksinimler: (paket, gereken paket, kısıt) - pip check benzeri"""
+        self.refresh()
+        problems = []
+        with self._lock:
+            for key, (name, _, dependencies) in sorted(self._nodes.items()):
+                for dependency in dependencies:
+                    target = self._nodes.get(dependency.key)
+                    if target is None or satisfies(dependency.specifier, target[1]) is False:
+                        problems.append((name, self._name(dependency.key), dependency.specifier))
+        return problems
@@ -0,0 +1,179 @@
+import os
+import sys
+import json
+import shutil
+import hashlib
+import logging
+import zipfile
+import tempfile
+import threading
+from typing import Dict, List, NamedTuple, Optional
+from package_manager import Wheelhouse, normalize_name, strip_requirement
+from fileutil import file_sha256, write_json_atomic
+import config
+
+logger = logging.getLogger(__name__)
+
+class Environment(NamedTuple):
+    key: str
+    site_packages: str
+    # Ortamın sağladığı üst seviye modüller
+    modules: List[str]
+
+class EnvironmentStore:
+    """İçerik adresli wheel deposundan hardlink ile script ortamları kurar
+
+    Wheel'ler PackageManager ile paylaşılan Wheelhouse'tan gelir. Dizin yapısı:
+        unpacked/<sha256>/          site-packages düzeninde açılmış wheel
+        envs/<anahtar>/             açılmış paketlerin hardlink'lerinden oluşan ortam
+        resolutions.json            gereksinim kümesi -> ortam
+    """
+
+    def __init__(self, root: Optional[str] = None, wheelhouse: Optional[Wheelhouse] = None):
+        self.root = root or os.path.join(config.CACHE_DIR, 'environments')
+        self.wheelhouse = wheelhouse or Wheelhouse()
+        self.unpacked_dir = os.path.join(self.root, 'unpacked')
+        self.envs_dir = os.path.join(self.root, 'envs')
+        self.resolutions_path = os.path.join(self.root, 'resolutions.json')
+        for path in (self.unpacked_dir, self.envs_dir):
+            os.makedirs(path, exist_ok=True)
+
+        self._resolutions: Dict[str, dict] = self._load_resolutions()
+        self._lock = threading.Lock()
+
+    def _load_resolutions(self) -> Dict[str, dict]:
+        try:
+            with open(self.resolutions_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            logger.warning(f"Ortam çözümleme kaydı okunamadı: {e}")
+            return {}
+
+    def _save_resolutions(self):
+        write_json_atomic(self.resolutions_path, self._resolutions)
+
+    @staticmethod
+    def requirements_key(requirements: List[str]) -> str:
+        """Gereksinim kümesi ve yorumlayıcı için anahtar"""
+        names = set()
+        for requirement in requirements:
+            name = strip_requirement(requirement)
+            names.add(normalize_name(name) + requirement.strip()[len(name):].replace(' ', ''))
+        tag = f"{sys.implementation.cache_tag}-{sys.platform}"
+        return hashlib.sha256('\n'.join([tag] + sorted(names)).encode()).hexdigest()
+
+    def lookup(self, requirements: List[str]) -> Optional[Environment]:
+        """Gereksinimler için kurulu ortam, yoksa None (kurmaz)"""
+        return self._cached(self.requirements_key(requirements))
+
+    def prepare(self, requirements: List[str]) -> Environment:
+        """Gereksinimleri sağlayan ortamı döndür, yoksa kur"""
+        key = self.requirements_key(requirements)
+        env = self._cached(key)
+        if env:
+            return env
+
+        with self._lock:
+            env = self._cached(key)
+            if env:
+                return env
+
+            wheels = self.wheelhouse.build(requirements, timeout=300 * len(requirements))
+            shas = [self._store_wheel(path) for path in wheels]
+            env_key = hashlib.sha256('\n'.join(sorted(shas)).encode()).hexdigest()
+            site_packages = os.path.join(self.envs_dir, env_key)
+            if not os.path.isdir(site_packages):
+                self._materialize(sorted(shas), site_packages)
+
+            self._resolutions[key] = {
+                'env': env_key,
+                'wheels': sorted(shas),
+                'modules': self._top_level_modules(site_packages),
+            }
+            self._save_resolutions()
+            logger.info(f"🧪 Ortam hazırlandı: {', '.join(requirements)} ({env_key[:12]})")
+            return self._cached(key)
+
+    def _cached(self, key: str) -> Optional[Environment]:
+        """Daha önce çözülmüş ve diskte duran ortam"""
+        record = self._resolutions.get(key)
+        if not record:
+            return None
+        site_packages = os.path.join(self.envs_dir, record['env'])
+        if not os.path.isdir(site_packages):
+            return None
+        return Environment(record['env'], site_packages, record['modules'])
+
+    def _store_wheel(self, wheel_path: str) -> str:
+        """Wheel'i içerik özetiyle açılmış paket deposuna ekle"""
+        sha = file_sha256(wheel_path)
+        target = os.path.join(self.unpacked_dir, sha)
+        if os.path.isdir(target):
+            return sha
+
+        tmp_dir = tempfile.mkdtemp(prefix='unpack-', dir=self.unpacked_dir)
+        try:
+            with zipfile.ZipFile(wheel_path) as wheel:
+                wheel.extractall(tmp_dir)
+
+            # <ad>.data/purelib ve platlib içerikleri site-packages köküne taşınır
+            for entry in os.listdir(tmp_dir):
+                if not entry.endswith('.data'):
+                    continue
+                data_dir = os.path.join(tmp_dir, entry)
+                for scheme in ('purelib', 'platlib'):
+                    scheme_dir = os.path.join(data_dir, scheme)
+                    if os.path.isdir(scheme_dir):
+                        shutil.copytree(scheme_dir, tmp_dir, dirs_exist_ok=True)
+                shutil.rmtree(data_dir)
+
+            try:
+                os.rename(tmp_dir, target)
+            except OSError:
+                # Başka bir süreç aynı wheel'i aynı anda açtı
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+        except Exception:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+        return sha
+
+    def _materialize(self, shas: List[str], site_packages: str):
+        """Açılmış paketleri hardlink (olmazsa symlink) ile tek dizinde birleştir"""
+        tmp_dir = tempfile.mkdtemp(prefix='env-', dir=self.envs_dir)
+        try:
+            for sha in shas:
+                source_root = os.path.join(self.unpacked_dir, sha)
+                for dirpath, _, filenames in os.walk(source_root):
+                    relative = os.path.relpath(dirpath, source_root)
+                    target_dir = os.path.normpath(os.path.join(tmp_dir, relative))
+                    os.makedirs(target_dir, exist_ok=True)
+                    for filename in filenames:
+                        target = os.path.join(target_dir, filename)
+                        if os.path.lexists(target):
+                            continue
+                        source = os.path.join(dirpath, filename)
+                        try:
+                            os.link(source, target)
+                        except OSError:
+                            os.symlink(source, target)
+            os.rename(tmp_dir, site_packages)
+        except Exception:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            if not os.path.isdir(site_packages):
+                raise
+
+    @staticmethod
+    def _top_level_modules(site_packages: str) -> List[str]:
+        """Ortamdaki üst seviye modül/paket adları"""
+        modules = set()
+        for entry in os.listdir(site_packages):
+            if entry.endswith(('.dist-info', '.data')) or entry == '__pycache__':
+                continue
+            path = os.path.join(site_packages, entry)
+            if os.path.isdir(path):
+                modules.add(entry)
+            elif entry.endswith(('.py', '.so', '.pyd')):
+                modules.add(entry.split('.')[0])
+        return sorted(modules)
@@ -2,15 +2,141 @@ import subprocess
 import sys
 import os
 import ast
+import signal
+import hashlib
 import logging
-from typing import Tuple, List
+import codecs
+from collections import deque
+import tempfile
+import importlib.util
+from typing import Callable, Dict, Hashable, List, NamedTuple, Optional, Tuple
 from package_manager import PackageManager
+from module_resolver import ModuleResolver
+from worker_pool import (OutputCallback, JobUsage, PoolUnavailable, ResourceLimits, WorkerPool,
+                         limited_command, pump_process)
+from cache import LRUCache
+from fileutil import file_sha256
+from environments import Environment, EnvironmentStore
+from metrics import REGISTRY, MetricsRegistry
+import config
 
 logger = logging.getLogger(__name__)
 
+STAGE_HELP = "execute_file aşama süreleri (parse, dependency_check, install, run)"
+
+class ExecutionResult(NamedTuple):
+    success: bool
+    stdout: str
+    stderr: str
+    # Çıktı mesaj sınırını aştıysa tam çıktının dosyası (silmek çağırana aittir)
+    output_file: Optional[str] = None
+    usage: Optional[JobUsage] = None
+    # Sonuç önbelleğinden geldi (script çalıştırılmadı)
+    cached: bool = False
+
+class OutputCollector:
+    """Çıktıyı sınırlı bellekle toplar: akışların son kısmı bellekte, tamamı (sınırlı) diskte"""
+    
+    def __init__(self, tail_size: int, spool_limit: int,
+                 on_output: Optional[Callable[["OutputCollector"], None]] = None):
+        self.tail_size = tail_size
+        self.spool_limit = spool_limit
+        self.on_output = on_output
+        self.total = 0
+        self._tails: Dict[str, str] = {'stdout': '', 'stderr': ''}
+        self._decoders = {name: codecs.getincrementaldecoder('utf-8')(errors='replace')
+                          for name in self._tails}
+        self._spool = tempfile.NamedTemporaryFile(prefix='output-', suffix='.txt', delete=False)
+        self._spooled = 0
+        
+    @property
+    def path(self) -> str:
+        return self._spool.name
+        
+    @property
+    def truncated(self) -> bool:
+        """Dosyaya sığmayan çıktı kaldı mı"""
+        return self.total > self._spooled
+        
+    def write(self, stream: str, data: bytes):
+        """Çocuk süreçten gelen bir çıktı parçasını ekle"""
+        self.total += len(data)
+        text = self._decoders[stream].decode(data)
+        self._tails[stream] = (self._tails[stream] + text)[-self.tail_size:]
+        
+        if self._spooled < self.spool_limit:
+            chunk = data[:self.spool_limit - self._spooled]
+            self._spool.write(chunk)
+            self._spooled += len(chunk)
+            
+        if self.on_output:
+            try:
+                self.on_output(self)
+            except Exception as e:
+                logger.warning(f"Çıktı bildirimi hatası: {e}")
+                
+    def tail(self, stream: str) -> str:
+        """Akışın bellekte tutulan son kısmı"""
+        return self._tails[stream]
+        
+    def close(self):
+        for name, decoder in self._decoders.items():
+            self._tails[name] = (self._tails[name] + decoder.decode(b'', final=True))[-self.tail_size:]
+        self._spool.close()
+        
+    def discard(self):
+        """Disk dosyasını sil"""
+        try:
+            os.remove(self._spool.name)
+        except FileNotFoundError:
+            pass
+
 class PythonExecutor:
     def __init__(self, package_manager: PackageManager):
         self.package_manager = package_manager
+        self.resolver = ModuleResolver(package_manager)
+        
+        # İçerik özeti -> {'imports': [...], 'ready': bağımlılıkların tam olduğu index_version}
+        cache_path = os.path.join(config.CACHE_DIR, 'analysis_cache.json') if config.ANALYSIS_CACHE_PERSIST else None
+        self.analysis_cache = LRUCache(config.ANALYSIS_CACHE_SIZE, path=cache_path)
+        
+        # İsteğe bağlı sonuç önbelleği: içerik özeti + bağımlılık parmak izi -> çıktı
+        self.result_cache = None
+        if config.RESULT_CACHE:
+            result_path = os.path.join(config.CACHE_DIR, 'result_cache.json') if config.RESULT_CACHE_PERSIST else None
+            self.result_cache = LRUCache(max_entries=100000, max_bytes=config.RESULT_CACHE_MAX_BYTES,
+                                         ttl=config.RESULT_CACHE_TTL, path=result_path)
+        
+        # İş başına kaynak sınırları ve son işlerin kaynak kullanımı
+        self.limits = ResourceLimits(config.LIMIT_CPU_SECONDS, config.LIMIT_MEMORY_MB,
+                                     config.LIMIT_OPEN_FILES, config.LIMIT_PROCESSES)
+        # (sahibi, dosya adı, başarılı mı, kaynak kullanımı)
+        self.recent_jobs = deque(maxlen=200)
+        REGISTRY.add_callback(self._collect_metrics)
+        
+        # Script bağımlılıkları botun yorumlayıcısı yerine izole ortamlara kurulur
+        self.environments = EnvironmentStore(wheelhouse=package_manager.wheelhouse) if config.ISOLATED_ENVS else None
+        
+        # fork desteklenen sistemlerde ısınmış worker havuzu kullan
+        self.pool = None
+        if config.WORKER_POOL_SIZE > 0 and hasattr(os, 'fork'):
+            self.pool = WorkerPool(config.WORKER_POOL_SIZE, config.WORKER_PRELOAD,
+                                   config.WORKER_MAX_JOBS)
+            self.pool.start(package_manager.index_version)
+        
+    def _collect_metrics(self, registry: MetricsRegistry):
+        """Önbellek isabet oranlarını göstergelere yaz"""
+        cache = self.analysis_cache
+        total = cache.hits + cache.misses
+        registry.set('cache_hit_ratio', cache.hits / total if total else 0.0,
+                     "Önbellek isabet oranı", cache='analysis')
+        registry.set('cache_entries', len(cache), "Önbellekteki kayıt sayısı", cache='analysis')
+        if self.result_cache is not None:
+            cache = self.result_cache
+            total = cache.hits + cache.misses
+            registry.set('cache_hit_ratio', cache.hits / total if total else 0.0, cache='result')
+            registry.set('cache_entries', len(cache), cache='result')
+            registry.set('cache_bytes', cache.size_bytes, "Önbellek boyutu (bayt)", cache='result')
         
     def extract_imports(self, file_path: str) -> List[str]:
         """Python dosyasındaki import'ları bul"""
@@ -27,7 +153,8 @@ class PythonExecutor:
                     for alias in node.names:
                         imports.append(alias.name.split('.')[0])
                 elif isinstance(node, ast.ImportFrom):
-                    if node.module:
+                    # Göreli import'lar (from . import x) yerel modüldür
+                    if node.module and not node.level:
                         imports.append(node.module.split('.')[0])
                         
         except Exception as e:
@@ -35,50 +162,234 @@ class PythonExecutor:
             
         return list(set(imports))
     
+    def is_available(self, module: str, script_dir: str) -> bool:
+        """Modül yüklemeye gerek kalmadan import edilebilir mi"""
+        # Standart kütüphane ve yorumlayıcıya gömülü modüller
+        if module in sys.stdlib_module_names or module in sys.builtin_module_names:
+            return True
+            
+        # Script'in yanındaki yerel modül/paket
+        if os.path.isfile(os.path.join(script_dir, f"{module}.py")) or \
+                os.path.isdir(os.path.join(script_dir, module)):
+            return True
+            
+        # Zaten import edilebilen modüller
+        try:
+            return importlib.util.find_spec(module) is not None
+        except (ImportError, ValueError):
+            return False
+    
     def install_requirements(self, file_path: str) -> Tuple[bool, str]:
         """Gerekli paketleri yükle"""
-        imports = self.extract_imports(file_path)
+        success, message, _ = self.prepare_requirements(file_path)
+        return success, message
+    
+    def prepare_requirements(self, file_path: str,
+                             digest: Optional[str] = None) -> Tuple[bool, str, Optional[Environment]]:
+        """Eksik paketleri izole ortamda hazırla (kapalıysa yorumlayıcıya yükle)
+
+        (başarılı mı, mesaj, script'in çalışacağı ortam) döndürür.
+        """
+        digest = digest or file_sha256(file_path)
+        cached = self.analysis_cache.get(digest)
+        
+        # Aynı içerik, aynı yüklü paket kümesiyle daha önce hazır bulunduysa tekrar kontrol etme
+        if cached and cached['ready'] == self.package_manager.index_version:
+            missing_packages = cached.get('requirements', [])
+        else:
+            if cached:
+                imports = cached['imports']
+            else:
+                with REGISTRY.timer('execute_stage_seconds', STAGE_HELP, stage='parse'):
+                    imports = self.extract_imports(file_path)
+            with REGISTRY.timer('execute_stage_seconds', STAGE_HELP, stage='dependency_check'):
+                missing_packages = self._missing_packages(imports, file_path)
+            
+            if missing_packages and self.environments is None:
+                logger.info(f"📦 Eksik paketler: {missing_packages}")
+                with REGISTRY.timer('execute_stage_seconds', STAGE_HELP, stage='install'):
+                    results = self.package_manager.install_packages(missing_packages)
+                
+                failed = [pkg for pkg, success in results.items() if not success]
+                if failed:
+                    self.analysis_cache.set(digest, {'imports': imports, 'ready': None})
+                    return False, f"Paketler yüklenemedi: {', '.join(failed)}", None
+                missing_packages = []
+                
+            self.analysis_cache.set(digest, {
+                'imports': imports,
+                'ready': self.package_manager.index_version,
+                'requirements': missing_packages,
+            })
+            
+        if not missing_packages:
+            return True, "Tüm paketler yüklendi", None
+            
+        try:
+            with REGISTRY.timer('execute_stage_seconds', STAGE_HELP, stage='install'):
+                env = self.environments.prepare(missing_packages)
+        except Exception as e:
+            logger.error(f"❌ Ortam hazırlanamadı: {e}")
+            self.analysis_cache.delete(digest)
+            return False, f"Paketler yüklenemedi: {', '.join(missing_packages)}", None
+        return True, "Tüm paketler yüklendi", env
+    
+    def _missing_packages(self, imports: List[str], file_path: str) -> List[str]:
+        """Import'lardan yüklü olmayan dağıtımları bul"""
+        script_dir = os.path.dirname(os.path.abspath(file_path))
         missing_packages = []
         
         for imp in imports:
-            if imp not in ['os', 'sys', 're', 'json', 'datetime', 'math', 
-                          'random', 'time', 'collections', 'itertools']:  # Built-in modüller
-                if not self.package_manager.is_package_installed(imp):
-                    missing_packages.append(imp)
-                    
-        if missing_packages:
-            logger.info(f"📦 Eksik paketler: {missing_packages}")
-            results = self.package_manager.install_packages(missing_packages)
-            
-            failed = [pkg for pkg, success in results.items() if not success]
-            if failed:
-                return False, f"Paketler yüklenemedi: {', '.join(failed)}"
+            if self.is_available(imp, script_dir):
+                continue
                 
-        return True, "Tüm paketler yüklendi"
+            # Modülü sağlayan dağıtım zaten yüklüyse pip'e gitme
+            if self.resolver.is_installed(imp):
+                continue
+                
+            package = self.resolver.resolve(imp)
+            if not self.package_manager.is_package_installed(package) and package not in missing_packages:
+                missing_packages.append(package)
+                
+        return missing_packages
+    
+    def _run_script(self, file_path: str, on_output: OutputCallback,
+                    env: Optional[Environment] = None) -> Tuple[int, bool, JobUsage]:
+        """Script'i worker havuzunda, havuz yoksa yeni bir süreçte çalıştır
+
+        (dönüş kodu, zaman aşımı oldu mu, kaynak kullanımı) döndürür.
+        """
+        sys_path = [env.site_packages] if env else []
+        
+        # Ortamdaki bir modül worker'da önceden yüklüyse ortamın sürümü görünmez
+        if self.pool is not None and not (env and self.pool.conflicts(env.modules)):
+            try:
+                return self.pool.run(file_path, 60, on_output, self.package_manager.index_version,
+                                     sys_path, self.limits)
+            except PoolUnavailable as e:
+                # Worker'lar meşgulse beklemek yerine, worker bozulduysa kullanıcıya hata
+                # göstermek yerine yeni süreçte çalıştır
+                if e.__cause__ is not None:
+                    logger.warning(f"{e}, script yeni süreçte çalıştırılıyor")
+                REGISTRY.inc('worker_pool_fallback_total', help_text="Worker havuzu yerine yeni süreçte çalışan işler",
+                             reason='error' if e.__cause__ is not None else 'busy')
+            
+        child_env = None
+        if sys_path:
+            child_env = dict(os.environ)
+            child_env['PYTHONPATH'] = os.pathsep.join(sys_path + [p for p in [os.environ.get('PYTHONPATH')] if p])
+            
+        # Sınırlar script başlamadan, başlatıcı süreçte uygulanıp exec ile devredilir
+        process = subprocess.Popen(
+            limited_command(self.limits, file_path),
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            cwd=os.path.dirname(file_path) or None,
+            env=child_env,
+            start_new_session=True
+        )
+        # Borular pump_process tarafından okunup kapatılır
+        stdout_fd = os.dup(process.stdout.fileno())
+        stderr_fd = os.dup(process.stderr.fileno())
+        process.stdout.close()
+        process.stderr.close()
+        
+        returncode, timed_out, usage = pump_process(process.pid, stdout_fd, stderr_fd, 60, on_output)
+        process.returncode = returncode
+        return returncode, timed_out, usage
+    
+    def result_key(self, digest: str, env: Optional[Environment] = None) -> str:
+        """Sonuç önbelleği anahtarı: script içerik özeti + yüklü paket kümesi + izole ortam"""
+        parts = [digest, self.package_manager.index_version, env.key if env else '']
+        return hashlib.sha256('\n'.join(parts).encode()).hexdigest()
+    
+    def cached_result(self, digest: str) -> Optional[ExecutionResult]:
+        """İçerik özeti bilinen script'in önbellekteki sonucu (hiçbir şey kurmadan/indirmeden)
+
+        Sadece bağımlılıkları mevcut paket kümesiyle hazır bulunmuş ve izole ortamı
+        zaten kurulu script'ler için bakılır; aksi halde None döner.
+        """
+        if self.result_cache is None:
+            return None
+        analysis = self.analysis_cache.get(digest)
+        if not analysis or analysis['ready'] != self.package_manager.index_version:
+            return None
+        env = None
+        requirements = analysis.get('requirements', [])
+        if requirements:
+            env = self.environments.lookup(requirements) if self.environments else None
+            if env is None:
+                return None
+        cached = self.result_cache.get(self.result_key(digest, env))
+        if cached is None:
+            return None
+        return ExecutionResult(True, cached['stdout'], cached['stderr'], cached=True)
     
-    def execute_file(self, file_path: str) -> Tuple[bool, str, str]:
-        """Python dosyasını çalıştır"""
+    def run_file(self, file_path: str,
+                 on_output: Optional[Callable[["OutputCollector"], None]] = None,
+                 use_cache: bool = True, owner: Optional[Hashable] = None) -> ExecutionResult:
+        """Python dosyasını çalıştır, çıktıyı sınırlı bellekle akış halinde topla
+
+        Sonuç önbelleği açıksa aynı script aynı bağımlılıklarla tekrar çalıştırılmaz;
+        use_cache=False önbelleği atlar (sonuç yine de kaydedilir). owner, son işler
+        listesinde işi çalıştıran kullanıcıyı ayırmak için saklanır.
+        """
         try:
-            # Önce gerekli paketleri yükle
-            success, message = self.install_requirements(file_path)
+            # Önce gerekli paketleri hazırla
+            digest = file_sha256(file_path)
+            success, message, env = self.prepare_requirements(file_path, digest)
             if not success:
-                return False, "", message
+                return ExecutionResult(False, "", message)
                 
-            # Dosyayı çalıştır
-            result = subprocess.run(
-                [sys.executable, file_path],
-                capture_output=True,
-                text=True,
-                timeout=60,
-                cwd=os.path.dirname(file_path) or None
-            )
-            
-            if result.returncode == 0:
-                return True, result.stdout, result.stderr
-            else:
-                return False, result.stdout, result.stderr
+            cache_key = None
+            if self.result_cache is not None:
+                cache_key = self.result_key(digest, env)
+                cached = self.result_cache.get(cache_key) if use_cache else None
+                if cached is not None:
+                    logger.info(f"♻️ {os.path.basename(file_path)} sonucu önbellekten")
+                    return ExecutionResult(True, cached['stdout'], cached['stderr'], cached=True)
+                
+            collector = OutputCollector(config.OUTPUT_TAIL_CHARS, config.OUTPUT_SPOOL_LIMIT, on_output)
+            try:
+                # Dosyayı çalıştır
+                with REGISTRY.timer('execute_stage_seconds', STAGE_HELP, stage='run'):
+                    returncode, timed_out, usage = self._run_script(file_path, collector.write, env)
+            except Exception:
+                collector.close()
+                collector.discard()
+                raise
+            collector.close()
+                
+            success = returncode == 0 and not timed_out
+            stderr = "Zaman aşımı (60 saniye)" if timed_out else collector.tail('stderr')
+            if returncode < 0 and not timed_out:
+                # Kaynak sınırı aşıldığında süreç sinyalle öldürülür (ör. SIGXCPU, SIGKILL)
+                stderr += f"\nSüreç {signal.Signals(-returncode).name} sinyaliyle sonlandırıldı"
+            self.recent_jobs.append((owner, os.path.basename(file_path), success, usage))
+                
+            # Mesaja sığmayan çıktının tamamı dosya olarak verilir
+            output_file = collector.path if collector.total > config.OUTPUT_TAIL_CHARS else None
+            if output_file is None:
+                collector.discard()
+                
+            stdout = collector.tail('stdout')
+            # Sadece başarılı ve mesaja sığan sonuçlar saklanır
+            if cache_key and success and output_file is None:
+                self.result_cache.set(cache_key, {'stdout': stdout, 'stderr': stderr},
+                                      size=len(stdout.encode()) + len(stderr.encode()))
+                
+            return ExecutionResult(success, stdout, stderr, output_file, usage)
                 
-        except subprocess.TimeoutExpired:
-            return False, "", "Zaman aşımı (60 saniye)"
         except Exception as e:
-            return False, "", str(e)
+            return ExecutionResult(False, "", str(e))
+    
+    def execute_file(self, file_path: str, use_cache: bool = True) -> Tuple[bool, str, str]:
+        """Python dosyasını çalıştır, (başarılı mı, stdout, stderr) döndür
+
+        stdout ve stderr çıktının sadece son OUTPUT_TAIL_CHARS karakteridir; daha uzun
+        çıktının tamamı gerekiyorsa run_file kullanılmalı (ExecutionResult.output_file).
+        """
+        result = self.run_file(file_path, use_cache=use_cache)
+        if result.output_file:
+            os.remove(result.output_file)
+        return result.success, result.stdout, result.stderr
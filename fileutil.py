@@ -0,0 +1,34 @@
+import os
+import json
+import hashlib
+from typing import Any, BinaryIO, Iterable, Optional
+
+# Dosyalar belleğe alınmadan bu boyutta parçalarla okunur
+CHUNK_SIZE = 65536
+
+def sha256_stream(chunks: Iterable[bytes], out: Optional[BinaryIO] = None) -> str:
+    """Parçaların SHA-256 özeti; out verilirse parçalar aynı anda oraya yazılır"""
+    digest = hashlib.sha256()
+    for chunk in chunks:
+        digest.update(chunk)
+        if out is not None:
+            out.write(chunk)
+    return digest.hexdigest()
+
+def file_sha256(path: str) -> str:
+    """Dosya içeriğinin SHA-256 özeti"""
+    with open(path, 'rb') as f:
+        return sha256_stream(iter(lambda: f.read(CHUNK_SIZE), b''))
+
+def write_json_atomic(path: str, data: Any):
+    """JSON'u geçici dosyaya yazıp yerine taşı (okuyan hiçbir zaman yarım dosya görmez)"""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
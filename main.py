@@ -1,9 +1,15 @@
+import time
+
+_STARTED = time.perf_counter()
+
 import os
 import sys
-import subprocess
 import logging
-from package_manager import PackageManager
-from bot import BotManager
+import subprocess
+import importlib.util
+from contextlib import contextmanager
+from importlib import metadata
+from typing import Dict, List, Tuple
 
 # Loglama ayarları
 logging.basicConfig(
@@ -12,38 +18,87 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-def check_and_install_base_packages():
-    """Temel paketleri kontrol et ve yükle"""
-    required_packages = ['python-telegram-bot', 'requests', 'pipdeptree']
-    
-    for package in required_packages:
+# Temel dağıtımlar ve import edilen modül adları (dağıtım adı import adıyla aynı olmak zorunda değil)
+BASE_PACKAGES = {
+    'python-telegram-bot': 'telegram',
+    'requests': 'requests',
+    'pipdeptree': 'pipdeptree',
+}
+
+class StartupTimer:
+    """Başlangıç aşamalarının sürelerini tutar"""
+
+    def __init__(self):
+        self.phases: List[Tuple[str, float]] = [('imports', time.perf_counter() - _STARTED)]
+
+    @contextmanager
+    def phase(self, name: str):
+        started = time.perf_counter()
         try:
-            __import__(package.replace('-', '_'))
-            logger.info(f"✅ {package} zaten yüklü")
-        except ImportError:
-            logger.info(f"📦 {package} yükleniyor...")
-            subprocess.check_call([sys.executable, "-m", "pip", "install", package])
+            yield
+        finally:
+            self.phases.append((name, time.perf_counter() - started))
+
+    def log(self):
+        breakdown = ', '.join(f"{name} {seconds * 1000:.0f} ms" for name, seconds in self.phases)
+        logger.info(f"⏱️ Başlangıç {(time.perf_counter() - _STARTED) * 1000:.0f} ms ({breakdown})")
+
+def missing_base_packages() -> Dict[str, str]:
+    """Yüklü olmayan veya modülü bulunamayan temel dağıtımlar (pip çalıştırmadan)"""
+    missing = {}
+    for distribution, module in BASE_PACKAGES.items():
+        try:
+            version = metadata.version(distribution)
+        except metadata.PackageNotFoundError:
+            missing[distribution] = module
+            continue
+        if importlib.util.find_spec(module) is None:
+            missing[distribution] = module
+        else:
+            logger.debug(f"✅ {distribution} {version} zaten yüklü")
+    return missing
+
+def check_and_install_base_packages():
+    """Temel paketleri kontrol et, sadece eksik olanları yükle"""
+    missing = missing_base_packages()
+    if not missing:
+        return
+
+    for distribution in missing:
+        logger.warning(f"📦 {distribution} eksik, yükleniyor...")
+        subprocess.check_call([sys.executable, "-m", "pip", "install", distribution])
+    importlib.invalidate_caches()
 
 def main():
     """Ana uygulama başlangıcı"""
+    timer = StartupTimer()
     try:
         # Temel paketleri kontrol et
-        check_and_install_base_packages()
-        
+        with timer.phase('base_check'):
+            check_and_install_base_packages()
+
         # Bot token'ı kontrol et
         bot_token = os.environ.get('TELEGRAM_BOT_TOKEN')
         if not bot_token:
             logger.error("❌ TELEGRAM_BOT_TOKEN bulunamadı!")
             logger.info("Lütfen .env dosyası oluşturun veya environment variable ekleyin")
             sys.exit(1)
-        
+
+        # Ağır modüller (telegram, executor, worker havuzu) ancak burada yüklenir
+        with timer.phase('bot_import'):
+            from package_manager import PackageManager
+            from bot import BotManager
+
         # Paket yöneticisini başlat
-        package_manager = PackageManager()
-        
+        with timer.phase('package_manager'):
+            package_manager = PackageManager()
+
         # Bot'u başlat
-        bot_manager = BotManager(bot_token, package_manager)
+        with timer.phase('bot_init'):
+            bot_manager = BotManager(bot_token, package_manager)
+        timer.log()
         bot_manager.start()
-        
+
     except KeyboardInterrupt:
         logger.info("👋 Bot durduruldu")
     except Exception as e:
@@ -0,0 +1,174 @@
+import time
+import bisect
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Süre histogramları için varsayılan kova sınırları (saniye)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+def _label_key(labels: Dict[str, object]) -> LabelKey:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+class _Histogram:
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> float:
+        """Kova sınırlarından yaklaşık yüzdelik"""
+        target = q * self.count
+        total = 0
+        for i, count in enumerate(self.counts):
+            total += count
+            if total >= target and count:
+                return self.buckets[i] if i < len(self.buckets) else float('inf')
+        return 0.0
+
+class MetricsRegistry:
+    """Sayaç, gösterge ve histogramları bellekte tutar; Prometheus metin formatında verir"""
+
+    def __init__(self):
+        self._types: Dict[str, str] = {}
+        self._help: Dict[str, str] = {}
+        self._counters: Dict[str, Dict[LabelKey, float]] = {}
+        self._gauges: Dict[str, Dict[LabelKey, float]] = {}
+        self._histograms: Dict[str, Dict[LabelKey, _Histogram]] = {}
+        self._callbacks: List[Callable[["MetricsRegistry"], None]] = []
+        self._lock = threading.Lock()
+
+    def _declare(self, name: str, kind: str, help_text: Optional[str]):
+        if name not in self._types:
+            self._types[name] = kind
+        if help_text:
+            self._help[name] = help_text
+
+    def inc(self, name: str, value: float = 1, help_text: Optional[str] = None, **labels):
+        """Sayacı artır"""
+        with self._lock:
+            self._declare(name, 'counter', help_text)
+            series = self._counters.setdefault(name, {})
+            key = _label_key(labels)
+            series[key] = series.get(key, 0) + value
+
+    def set(self, name: str, value: float, help_text: Optional[str] = None, **labels):
+        """Göstergeyi ayarla"""
+        with self._lock:
+            self._declare(name, 'gauge', help_text)
+            self._gauges.setdefault(name, {})[_label_key(labels)] = value
+
+    def observe(self, name: str, value: float, help_text: Optional[str] = None,
+                buckets: Tuple[float, ...] = DEFAULT_BUCKETS, **labels):
+        """Histograma değer ekle"""
+        with self._lock:
+            self._declare(name, 'histogram', help_text)
+            series = self._histograms.setdefault(name, {})
+            key = _label_key(labels)
+            if key not in series:
+                series[key] = _Histogram(buckets)
+            series[key].observe(value)
+
+    @contextmanager
+    def timer(self, name: str, help_text: Optional[str] = None, **labels):
+        """Bloğun süresini histograma ekle"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started, help_text, **labels)
+
+    def add_callback(self, callback: Callable[["MetricsRegistry"], None]):
+        """Okumadan hemen önce göstergeleri güncelleyecek fonksiyon ekle (kuyruk derinliği vb.)"""
+        self._callbacks.append(callback)
+
+    def collect(self):
+        for callback in self._callbacks:
+            try:
+                callback(self)
+            except Exception as e:
+                logger.warning(f"Metrik toplama hatası: {e}")
+
+    def counter_value(self, name: str, **labels) -> float:
+        return self._counters.get(name, {}).get(_label_key(labels), 0)
+
+    def gauge_value(self, name: str, **labels) -> Optional[float]:
+        return self._gauges.get(name, {}).get(_label_key(labels))
+
+    def histogram_summary(self, name: str) -> Dict[LabelKey, Tuple[int, float, float]]:
+        """Etiket kümesi -> (adet, ortalama, yaklaşık p95)"""
+        with self._lock:
+            return {key: (h.count, h.sum / h.count if h.count else 0.0, h.quantile(0.95))
+                    for key, h in self._histograms.get(name, {}).items()}
+
+    def render(self) -> str:
+        """Prometheus metin formatı"""
+        self.collect()
+        lines = []
+
+        def fmt_labels(key: LabelKey, extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+            pairs = key + extra
+            if not pairs:
+                return ''
+            return '{' + ','.join(f'{name}="{value}"' for name, value in pairs) + '}'
+
+        with self._lock:
+            for name in sorted(self._types):
+                kind = self._types[name]
+                if name in self._help:
+                    lines.append(f"# HELP {name} {self._help[name]}")
+                lines.append(f"# TYPE {name} {kind}")
+                if kind == 'histogram':
+                    for key, histogram in self._histograms.get(name, {}).items():
+                        cumulative = 0
+                        for bound, count in zip(histogram.buckets, histogram.counts):
+                            cumulative += count
+                            lines.append(f"{name}_bucket{fmt_labels(key, (('le', str(bound)),))} {cumulative}")
+                        lines.append(f"{name}_bucket{fmt_labels(key, (('le', '+Inf'),))} {histogram.count}")
+                        lines.append(f"{name}_sum{fmt_labels(key)} {histogram.sum}")
+                        lines.append(f"{name}_count{fmt_labels(key)} {histogram.count}")
+                else:
+                    series = self._counters if kind == 'counter' else self._gauges
+                    for key, value in series.get(name, {}).items():
+                        lines.append(f"{name}{fmt_labels(key)} {value}")
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = MetricsRegistry()
+
+
+def start_http_server(port: int, host: str = '127.0.0.1', registry: MetricsRegistry = REGISTRY):
+    """/metrics uç noktasını arka planda başlat"""
+    # http.server sadece metrik sunucusu açıldığında yüklenir (başlangıç süresi)
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split('?')[0] != '/metrics':
+                self.send_error(404)
+                return
+            body = registry.render().encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            logger.debug(format % args)
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, name='metrics-http', daemon=True).start()
+    logger.info(f"📈 Metrikler http://{host}:{port}/metrics adresinde")
+    return server
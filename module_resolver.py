@@ -0,0 +1,115 @@
+import os
+import json
+import logging
+import threading
+from importlib import metadata
+from typing import Dict, List, Optional
+from package_manager import PackageManager
+from fileutil import write_json_atomic
+import config
+
+logger = logging.getLogger(__name__)
+
+# Import adı ile PyPI dağıtım adı farklı olan yaygın paketler
+MODULE_ALIASES = {
+    'attr': 'attrs',
+    'Bio': 'biopython',
+    'bs4': 'beautifulsoup4',
+    'Crypto': 'pycryptodome',
+    'cv2': 'opencv-python',
+    'dateutil': 'python-dateutil',
+    'discord': 'discord.py',
+    'dns': 'dnspython',
+    'docx': 'python-docx',
+    'dotenv': 'python-dotenv',
+    'faiss': 'faiss-cpu',
+    'fitz': 'PyMuPDF',
+    'git': 'GitPython',
+    'gi': 'PyGObject',
+    'google': 'protobuf',
+    'googleapiclient': 'google-api-python-client',
+    'jose': 'python-jose',
+    'jwt': 'PyJWT',
+    'kafka': 'kafka-python',
+    'Levenshtein': 'python-Levenshtein',
+    'magic': 'python-magic',
+    'multipart': 'python-multipart',
+    'MySQLdb': 'mysqlclient',
+    'nacl': 'PyNaCl',
+    'OpenSSL': 'pyOpenSSL',
+    'PIL': 'Pillow',
+    'pkg_resources': 'setuptools',
+    'pptx': 'python-pptx',
+    'psycopg2': 'psycopg2-binary',
+    'serial': 'pyserial',
+    'skimage': 'scikit-image',
+    'sklearn': 'scikit-learn',
+    'slugify': 'python-slugify',
+    'socks': 'PySocks',
+    'speech_recognition': 'SpeechRecognition',
+    'telegram': 'python-telegram-bot',
+    'usb': 'pyusb',
+    'websocket': 'websocket-client',
+    'win32api': 'pywin32',
+    'wx': 'wxPython',
+    'yaml': 'PyYAML',
+    'zmq': 'pyzmq',
+}
+
+class ModuleResolver:
+    """Import edilen modül adlarını dağıtım (pip paket) adlarına çevirir"""
+
+    def __init__(self, package_manager: PackageManager, cache_path: Optional[str] = None):
+        self.package_manager = package_manager
+        self.cache_path = cache_path or os.path.join(config.CACHE_DIR, 'module_map.json')
+        self._modules: Optional[Dict[str, List[str]]] = None
+        self._index_version: Optional[str] = None
+        self._lock = threading.Lock()
+
+    def _load_cache(self, index_version: str) -> Optional[Dict[str, List[str]]]:
+        """Diskteki eşlemeyi oku, yüklü paket kümesi değiştiyse kullanma"""
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('index_version') == index_version:
+                return data['modules']
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning(f"Modül eşleme önbelleği okunamadı: {e}")
+        return None
+
+    def _save_cache(self, index_version: str, modules: Dict[str, List[str]]):
+        """Eşlemeyi diske atomik olarak yaz"""
+        try:
+            write_json_atomic(self.cache_path, {'index_version': index_version, 'modules': modules})
+        except Exception as e:
+            logger.warning(f"Modül eşleme önbelleği yazılamadı: {e}")
+
+    def installed_modules(self) -> Dict[str, List[str]]:
+        """Yüklü dağıtımların sağladığı üst seviye modüller: modül -> dağıtımlar"""
+        index_version = self.package_manager.index_version
+        if self._modules is not None and self._index_version == index_version:
+            return self._modules
+
+        with self._lock:
+            if self._modules is None or self._index_version != index_version:
+                modules = self._load_cache(index_version)
+                if modules is None:
+                    modules = {name: list(dict.fromkeys(dists))
+                               for name, dists in metadata.packages_distributions().items()}
+                    self._save_cache(index_version, modules)
+                self._modules = modules
+                self._index_version = index_version
+        return self._modules
+
+    def is_installed(self, module: str) -> bool:
+        """Modülü sağlayan bir dağıtım yüklü mü"""
+        return module in self.installed_modules()
+
+    def resolve(self, module: str) -> str:
+        """Modül adını yüklenecek dağıtım adına çevir"""
+        dists = self.installed_modules().get(module)
+        if dists:
+            return dists[0]
+        return MODULE_ALIASES.get(module, module)
@@ -0,0 +1,167 @@
+import re
+import json
+import time
+import logging
+import subprocess
+import threading
+from typing import Dict, List, Optional, Tuple
+from package_manager import PackageManager, index_args, normalize_name, run_pip
+import config
+
+try:
+    from packaging.version import Version
+except ImportError:
+    Version = None
+
+logger = logging.getLogger(__name__)
+
+def _release_key(version: str) -> Tuple[int, ...]:
+    """packaging yoksa kaba karşılaştırma için sürümün sayısal kısmı"""
+    match = re.match(r'\d+(\.\d+)*', version)
+    return tuple(int(part) for part in match.group().split('.')) if match else ()
+
+def is_newer(latest: str, installed: str) -> bool:
+    """latest, installed'dan daha yeni bir sürüm mü"""
+    if Version is not None:
+        try:
+            return Version(latest) > Version(installed)
+        except Exception:
+            pass
+    return _release_key(latest) > _release_key(installed)
+
+class OutdatedChecker:
+    """Güncel olmayan paketlerin zaman damgalı anlık görüntüsünü arka planda tazeler"""
+
+    def __init__(self, package_manager: PackageManager, ttl: Optional[float] = None,
+                 index: Optional[str] = None, poll_interval: Optional[float] = None):
+        self.package_manager = package_manager
+        self.ttl = ttl if ttl is not None else config.OUTDATED_TTL
+        self.index = index if index is not None else config.PACKAGE_INDEX
+        self.poll_interval = poll_interval if poll_interval is not None else config.OUTDATED_POLL_INTERVAL
+
+        # normalize ad -> (proje adı, yüklü versiyon, son versiyon)
+        self._outdated: Dict[str, Tuple[str, str, str]] = {}
+        # Son kontrol edilen yüklü versiyonlar: normalize ad -> versiyon
+        self._checked: Dict[str, str] = {}
+        self._checked_index_version: Optional[str] = None
+        # Değişmeyen paketlerin bilgisi son tam kontrol kadar eski
+        self.updated_at: Optional[float] = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self, delay: float = 0):
+        """Arka plan tazeleyicisini başlat (ilk kontrol delay saniye sonra, açılışı yavaşlatmadan)"""
+        self._thread = threading.Thread(target=self._run, args=(delay,), name='outdated-refresher', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self, delay: float = 0):
+        if self._stop.wait(delay):
+            return
+        while not self._stop.is_set():
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.error(f"Güncellik kontrolü hatası: {e}")
+            self._stop.wait(self.poll_interval)
+
+    def _installed_versions(self) -> Dict[str, str]:
+        """Yüklü paketler: normalize ad -> versiyon"""
+        versions = {}
+        for package in self.package_manager.get_installed_packages():
+            name, _, version = package.partition('==')
+            versions[normalize_name(name)] = version
+        return versions
+
+    def refresh(self, force: bool = False):
+        """TTL dolduysa tam, yüklü küme değiştiyse sadece değişenler için kontrol et"""
+        now = time.time()
+        if force or self.updated_at is None or now - self.updated_at >= self.ttl:
+            self._refresh_full()
+        elif self.package_manager.index_version != self._checked_index_version:
+            self._refresh_changed()
+
+    def _refresh_full(self):
+        """pip list --outdated ile tüm paketleri kontrol et"""
+        index_version = self.package_manager.index_version
+        installed = self._installed_versions()
+        result = run_pip(["list", "--outdated", "--format=json", "--disable-pip-version-check",
+                          *index_args(self.index)], timeout=config.OUTDATED_TIMEOUT)
+        if result.returncode != 0:
+            logger.error(f"❌ Güncel olmayan paketler alınamadı: {result.stderr}")
+            return
+
+        outdated = {}
+        for item in json.loads(result.stdout or '[]'):
+            outdated[normalize_name(item['name'])] = (item['name'], item['version'], item['latest_version'])
+
+        with self._lock:
+            self._outdated = outdated
+            self._checked = installed
+            self._checked_index_version = index_version
+            self.updated_at = time.time()
+        logger.info(f"🔍 Güncellik kontrolü tamamlandı: {len(outdated)} paket güncel değil")
+
+    def _refresh_changed(self):
+        """Sadece yüklü versiyonu değişen paketleri yeniden kontrol et"""
+        index_version = self.package_manager.index_version
+        installed = self._installed_versions()
+        changed = [key for key, version in installed.items() if self._checked.get(key) != version]
+        removed = [key for key in self._checked if key not in installed]
+
+        updates = {}
+        for key in changed:
+            updates[key] = self._latest_version(key)
+
+        with self._lock:
+            for key in removed:
+                self._outdated.pop(key, None)
+                self._checked.pop(key, None)
+            for key, latest in updates.items():
+                if latest is None:
+                    continue
+                name, version, is_outdated = latest
+                if is_outdated:
+                    self._outdated[key] = (name, installed[key], version)
+                else:
+                    self._outdated.pop(key, None)
+                self._checked[key] = installed[key]
+            # Sorgusu başarısız olan paket varsa sonraki turda tekrar denensin
+            if all(latest is not None for latest in updates.values()):
+                self._checked_index_version = index_version
+
+    def _latest_version(self, package: str) -> Optional[Tuple[str, str, bool]]:
+        """pip index versions ile (ad, son versiyon, güncel değil mi) döndür"""
+        try:
+            result = run_pip(["index", "versions", package, "--disable-pip-version-check",
+                              *index_args(self.index)], timeout=60)
+        except subprocess.TimeoutExpired:
+            logger.error(f"{package} versiyonları alınırken zaman aşımı")
+            return None
+
+        # Paket indekste yoksa güncel kabul et
+        match = re.match(r'^(\S+) \(([^)]+)\)', result.stdout)
+        if result.returncode != 0 or not match:
+            return package, '', False
+
+        name, latest = match.groups()
+        installed = self.package_manager.get_installed_version(package) or ''
+        return name, latest, is_newer(latest, installed)
+
+    def latest_version(self, package: str) -> Optional[str]:
+        """Paket güncel değilse bilinen son sürümü, değilse None"""
+        with self._lock:
+            entry = self._outdated.get(normalize_name(package))
+        return entry[2] if entry else None
+
+    def snapshot(self) -> Tuple[Optional[List[str]], Optional[float]]:
+        """(güncel olmayan paketler, görüntünün yaşı saniye) - henüz yoksa (None, None)"""
+        with self._lock:
+            if self.updated_at is None:
+                return None, None
+            packages = [f"{name} ({version} → {latest})"
+                        for name, version, latest in sorted(self._outdated.values())]
+            return packages, time.time() - self.updated_at
@@ -0,0 +1,589 @@
+import os
+import hashlib
+import subprocess
+import sys
+import logging
+import re
+import threading
+import time
+import bisect
+import shutil
+import tempfile
+from collections import OrderedDict
+from importlib import metadata
+from concurrent.futures import Future
+from typing import List, Dict, Optional, Set, Tuple
+from metrics import REGISTRY
+import config
+
+logger = logging.getLogger(__name__)
+
+_METADATA_SUFFIXES = ('.dist-info', '.egg-info')
+
+def normalize_name(name: str) -> str:
+    """Paket adını PEP 503'e göre normalize et"""
+    return re.sub(r'[-_.]+', '-', name).lower()
+
+def strip_requirement(requirement: str) -> str:
+    """Gereksinimden versiyon ve extra kısımlarını at"""
+    name = re.sub(r'[\[;=<>!~ ].*$', '', requirement.strip())
+    return name.strip()
+
+# pip'in gereksinimi çözemediğini (paket/sürüm yok, çakışma) gösteren hata mesajları
+_RESOLUTION_ERRORS = re.compile(r'No matching distribution found|Could not find a version that satisfies|'
+                                r'ResolutionImpossible|conflicting dependencies')
+
+class ResolutionError(RuntimeError):
+    """Gereksinimler indekste çözülemedi; doğrudan pip install de başarısız olur"""
+
+def run_pip(args: List[str], timeout: Optional[float] = None) -> subprocess.CompletedProcess:
+    """pip'i alt süreçte çalıştır, süresini ve sonucunu metriklere yaz"""
+    started = time.perf_counter()
+    outcome = 'error'
+    try:
+        result = subprocess.run(
+            [sys.executable, "-m", "pip", *args],
+            capture_output=True,
+            text=True,
+            timeout=timeout
+        )
+        outcome = 'success' if result.returncode == 0 else 'failure'
+        return result
+    except subprocess.TimeoutExpired:
+        outcome = 'timeout'
+        raise
+    finally:
+        command = args[0] if args else ''
+        REGISTRY.observe('pip_duration_seconds', time.perf_counter() - started,
+                         "pip alt süreç süreleri", command=command)
+        REGISTRY.inc('pip_runs_total', help_text="pip alt süreç sayısı", command=command, result=outcome)
+
+def index_args(index: Optional[str]) -> List[str]:
+    """Paket indeksi ayarını pip argümanlarına çevir (yerel dizin veya URL)"""
+    if not index:
+        return []
+    if os.path.isdir(index):
+        return ['--no-index', '--find-links', index]
+    return ['--index-url', index]
+
+class Wheelhouse:
+    """pip'in önce başvurduğu kalıcı yerel wheel deposu (paket indeksinin yerel aynası)
+
+    İndirilen ve kaynaktan derlenen her wheel burada saklanır; depoda bulunan
+    paketler indekse gitmeden (--no-index --find-links) yüklenir.
+    """
+
+    def __init__(self, path: Optional[str] = None, index: Optional[str] = None):
+        self.path = path or config.WHEELHOUSE_DIR
+        self.index = index if index is not None else config.PACKAGE_INDEX
+        self._names: Optional[Tuple[float, Set[str]]] = None
+
+    def find_links(self) -> List[str]:
+        return ['--find-links', self.path]
+
+    def available(self) -> Set[str]:
+        """Depoda wheel'i bulunan dağıtımlar (normalize ad)"""
+        try:
+            mtime = os.stat(self.path).st_mtime
+        except FileNotFoundError:
+            return set()
+        if self._names is None or self._names[0] != mtime:
+            # <dağıtım>-<versiyon>(-<build>)?-<python>-<abi>-<platform>.whl
+            names = {normalize_name(entry.split('-', 1)[0])
+                     for entry in os.listdir(self.path) if entry.endswith('.whl')}
+            self._names = (mtime, names)
+        return self._names[1]
+
+    def has(self, requirements: List[str]) -> bool:
+        """Tüm gereksinimlerin wheel'i depoda var mı (sürüm kısıtına bakılmaz)"""
+        available = self.available()
+        return all(normalize_name(strip_requirement(r)) in available for r in requirements)
+
+    def build(self, requirements: List[str], timeout: Optional[float] = None,
+              prefer_offline: bool = True) -> List[str]:
+        """Gereksinimleri bağımlılıklarıyla wheel olarak depoya al, çözülen wheel'leri döndür
+
+        prefer_offline ise önce sadece depodan çözülür; olmazsa indeksten indirilir/derlenir.
+        """
+        os.makedirs(self.path, exist_ok=True)
+        build_dir = tempfile.mkdtemp(prefix='wheels-', dir=self.path)
+        try:
+            base = ["wheel", "--disable-pip-version-check", "--wheel-dir", build_dir, *self.find_links()]
+            result = None
+            if prefer_offline and self.has(requirements):
+                result = run_pip(base + ["--no-index", *requirements], timeout=timeout)
+            if result is None or result.returncode != 0:
+                result = run_pip(base + [*index_args(self.index), *requirements], timeout=timeout)
+            if result.returncode != 0:
+                error = ResolutionError if _RESOLUTION_ERRORS.search(result.stderr) else RuntimeError
+                raise error(f"Wheel'ler hazırlanamadı: {result.stderr.strip()[-500:]}")
+
+            wheels = []
+            for name in os.listdir(build_dir):
+                if not name.endswith('.whl'):
+                    continue
+                target = os.path.join(self.path, name)
+                if not os.path.exists(target):
+                    os.replace(os.path.join(build_dir, name), target)
+                wheels.append(target)
+            return wheels
+        finally:
+            shutil.rmtree(build_dir, ignore_errors=True)
+
+    def prefetch(self, packages: List[str]):
+        """Depoda olmayan paketleri wheel olarak indir/derle"""
+        for package in packages:
+            if self.has([package]):
+                continue
+            try:
+                self.build([package], timeout=600)
+                logger.info(f"📥 {package} wheel deposuna alındı")
+            except Exception as e:
+                logger.warning(f"{package} önceden indirilemedi: {e}")
+
+    def start_prefetch(self, packages: List[str], delay: float = 0):
+        """Popüler paketleri arka planda (başlangıcı yavaşlatmadan) depoya al"""
+        def run():
+            time.sleep(delay)
+            self.prefetch(packages)
+        if packages:
+            threading.Thread(target=run, name='wheel-prefetch', daemon=True).start()
+
+class PackageSnapshot:
+    """Yüklü paketlerin sıralı, aranabilir görüntüsü (yüklü küme değişene kadar paylaşılır)
+
+    Önek araması sıralı anahtarlar üzerinde bisect ile, alt dizgi araması
+    1-3 karakterlik n-gram indeksiyle yapılır; her aramada tüm liste taranmaz.
+    """
+
+    NGRAM = 3
+
+    def __init__(self, version: str, index: Dict[str, Tuple[str, str]]):
+        self.version = version
+        self.keys = sorted(index)
+        self.packages = [f"{index[key][0]}=={index[key][1]}" for key in self.keys]
+        # n-gram -> anahtar sıra numaraları
+        self._grams: Dict[str, List[int]] = {}
+        for position, key in enumerate(self.keys):
+            grams = {key[i:i + n] for n in range(1, self.NGRAM + 1) for i in range(len(key) - n + 1)}
+            for gram in grams:
+                self._grams.setdefault(gram, []).append(position)
+        self._results: "OrderedDict[str, List[int]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def search(self, query: str) -> List[str]:
+        """Önce adı sorguyla başlayan, sonra adında sorgu geçen paketler"""
+        return [self.packages[i] for i in self._search(normalize_name(query.strip()))]
+
+    def _search(self, query: str) -> List[int]:
+        if not query:
+            return list(range(len(self.keys)))
+        with self._lock:
+            cached = self._results.get(query)
+            if cached is not None:
+                self._results.move_to_end(query)
+                return cached
+
+        start = bisect.bisect_left(self.keys, query)
+        end = bisect.bisect_left(self.keys, query + '\uffff', start)
+        prefix = range(start, end)
+
+        n = min(len(query), self.NGRAM)
+        candidates = None
+        for i in range(len(query) - n + 1):
+            positions = self._grams.get(query[i:i + n], ())
+            candidates = set(positions) if candidates is None else candidates.intersection(positions)
+            if not candidates:
+                break
+        substring = sorted(p for p in candidates or () if not start <= p < end and query in self.keys[p])
+
+        result = list(prefix) + substring
+        with self._lock:
+            self._results[query] = result
+            if len(self._results) > 256:
+                self._results.popitem(last=False)
+        return result
+
+    def page(self, query: str, page: int, size: int) -> Tuple[List[str], int, int, int]:
+        """(sayfadaki paketler, sayfa, sayfa sayısı, toplam eşleşme)"""
+        matches = self._search(normalize_name(query.strip()))
+        pages = max(1, -(-len(matches) // size))
+        page = min(max(page, 0), pages - 1)
+        return [self.packages[i] for i in matches[page * size:(page + 1) * size]], page, pages, len(matches)
+
+class PackageManager:
+    def __init__(self, paths: Optional[List[str]] = None, index: Optional[str] = None,
+                 wheelhouse: Optional[Wheelhouse] = None):
+        self.pip_path = sys.executable.replace('python', 'pip')
+        # None ise sys.path kullanılır (importlib.metadata ile aynı arama sırası)
+        self.paths = paths
+        # Tüm pip kurulumları önce yerel wheel deposuna bakar
+        self.index = index if index is not None else config.PACKAGE_INDEX
+        self.wheelhouse = wheelhouse or Wheelhouse(index=self.index)
+        
+        # Yüklü dağıtım indeksi: normalize ad -> (proje adı, versiyon)
+        self._index: Dict[str, Tuple[str, str]] = {}
+        # normalize ad -> metadata dizini (.dist-info/.egg-info)
+        self._locations: Dict[str, str] = {}
+        # Dizin bazında okunan metadata girişleri: dizin -> {giriş adı: (normalize ad, proje adı, versiyon)}
+        self._entries: Dict[str, Dict[str, Tuple[str, str, str]]] = {}
+        self._mtimes: Dict[str, float] = {}
+        self._snapshot: Optional[PackageSnapshot] = None
+        self._index_version: Optional[str] = None
+        self._index_lock = threading.Lock()
+        
+        # pip ile site-packages'ı değiştiren işlemler tek tek çalışır
+        self._pip_lock = threading.RLock()
+        # Devam eden yüklemeler: gereksinim anahtarı -> sonuç
+        self._inflight: Dict[str, Future] = {}
+        self._inflight_lock = threading.Lock()
+        
+        # requirements.txt içeriği: (mtime, satırlar)
+        self._requirements: Optional[Tuple[float, List[str]]] = None
+        
+    def _search_paths(self) -> List[str]:
+        """Dağıtım aranacak dizinleri döndür"""
+        paths = self.paths if self.paths is not None else sys.path
+        return [p for p in dict.fromkeys(paths) if p and os.path.isdir(p)]
+    
+    def _read_entry(self, path: str) -> Optional[Tuple[str, str, str]]:
+        """Tek bir .dist-info/.egg-info girişini oku"""
+        try:
+            dist = metadata.PathDistribution.at(path)
+            name = dist.metadata['Name']
+            if not name:
+                return None
+            return normalize_name(name), name, dist.version
+        except Exception as e:
+            logger.debug(f"Metadata okunamadı ({path}): {e}")
+            return None
+    
+    def _scan_dir(self, directory: str) -> Dict[str, Tuple[str, str, str]]:
+        """Dizini tara, sadece yeni eklenen girişlerin metadata'sını oku"""
+        known = self._entries.get(directory, {})
+        entries = {}
+        try:
+            names = os.listdir(directory)
+        except OSError:
+            return entries
+            
+        for entry in names:
+            if not entry.endswith(_METADATA_SUFFIXES):
+                continue
+            if entry in known:
+                entries[entry] = known[entry]
+                continue
+            info = self._read_entry(os.path.join(directory, entry))
+            if info:
+                entries[entry] = info
+        return entries
+    
+    def _sync_index(self, force: bool = False):
+        """Dizin mtime'ları değiştiyse indeksi artımlı olarak güncelle"""
+        with self._index_lock:
+            paths = self._search_paths()
+            mtimes = {}
+            for path in paths:
+                try:
+                    mtimes[path] = os.stat(path).st_mtime
+                except OSError:
+                    continue
+                    
+            if not force and mtimes == self._mtimes:
+                return
+                
+            changed = False
+            for path in mtimes:
+                if force or self._mtimes.get(path) != mtimes[path]:
+                    entries = self._scan_dir(path)
+                    if entries != self._entries.get(path):
+                        self._entries[path] = entries
+                        changed = True
+            for path in list(self._entries):
+                if path not in mtimes:
+                    del self._entries[path]
+                    changed = True
+            self._mtimes = mtimes
+            
+            if changed or not self._index:
+                # sys.path'te önce gelen dizin kazanır
+                index = {}
+                locations = {}
+                for path in reversed(list(mtimes)):
+                    for entry, (key, name, version) in self._entries.get(path, {}).items():
+                        index[key] = (name, version)
+                        locations[key] = os.path.join(path, entry)
+                self._index = index
+                self._locations = locations
+                self._snapshot = None
+                self._index_version = None
+                
+    def refresh_index(self):
+        """İndeksi zorla yeniden tara (pip işlemlerinden sonra)"""
+        self._sync_index(force=True)
+        
+    @property
+    def index_version(self) -> str:
+        """Yüklü paket kümesinin parmak izi (küme değişince değişir)"""
+        self._sync_index()
+        with self._index_lock:
+            index, version = self._index, self._index_version
+        if version is None:
+            digest = hashlib.sha1()
+            for key in sorted(index):
+                digest.update(f"{key}=={index[key][1]}\n".encode())
+            version = digest.hexdigest()
+            with self._index_lock:
+                # Bu arada indeks yenilendiyse eski özet yeni indekse yazılmaz
+                if self._index is index:
+                    self._index_version = version
+        return version
+        
+    def installed_distributions(self) -> Dict[str, Tuple[str, str, str]]:
+        """normalize ad -> (proje adı, versiyon, metadata dizini)"""
+        self._sync_index()
+        with self._index_lock:
+            return {key: (name, version, self._locations[key])
+                    for key, (name, version) in self._index.items()}
+        
+    def get_installed_version(self, package_name: str) -> Optional[str]:
+        """Yüklü paketin versiyonunu döndür, yoksa None"""
+        self._sync_index()
+        entry = self._index.get(normalize_name(strip_requirement(package_name)))
+        return entry[1] if entry else None
+        
+    def get_snapshot(self) -> PackageSnapshot:
+        """Yüklü paketlerin paylaşılan görüntüsü; yüklü küme değişince yeniden kurulur"""
+        version = self.index_version
+        snapshot = self._snapshot
+        if snapshot is None or snapshot.version != version:
+            snapshot = PackageSnapshot(version, dict(self._index))
+            self._snapshot = snapshot
+        return snapshot
+        
+    def get_installed_packages(self) -> List[str]:
+        """Yüklü paketleri listele"""
+        try:
+            return list(self.get_snapshot().packages)
+        except Exception as e:
+            logger.error(f"Paket listesi alınamadı: {e}")
+            return []
+    
+    def install_packages(self, packages: List[str], batch: bool = True) -> Dict[str, bool]:
+        """Paketleri yükle (varsayılan olarak tek pip çağrısıyla)"""
+        results = {}
+        pending = []
+        
+        for package in packages:
+            # Önce paket yüklü mü kontrol et
+            if self.is_package_installed(package):
+                logger.info(f"{package} zaten yüklü")
+                results[package] = True
+            elif package not in pending:
+                pending.append(package)
+                
+        if pending:
+            results.update(self._install_single_flight(pending, batch))
+            
+        return {package: results[package] for package in packages}
+    
+    def _requirement_key(self, requirement: str) -> str:
+        """Aynı gereksinimin farklı yazımlarını eşleştirmek için anahtar"""
+        name = strip_requirement(requirement)
+        rest = requirement.strip()[len(name):]
+        return normalize_name(name) + re.sub(r'\s+', '', rest).lower()
+    
+    def _install_single_flight(self, packages: List[str], batch: bool) -> Dict[str, bool]:
+        """Aynı paket zaten yükleniyorsa o işlemin sonucunu bekle, yoksa yükle"""
+        owned: Dict[str, Future] = {}
+        waiting: Dict[str, Future] = {}
+        
+        with self._inflight_lock:
+            for package in packages:
+                key = self._requirement_key(package)
+                future = self._inflight.get(key)
+                if future is None:
+                    future = Future()
+                    self._inflight[key] = future
+                    owned[package] = future
+                else:
+                    waiting[package] = future
+                    
+        results = {}
+        try:
+            if owned:
+                with self._pip_lock:
+                    # Kilit beklenirken başka bir işlem yüklemiş olabilir
+                    to_install = [p for p in owned if not self.is_package_installed(p)]
+                    results = {p: True for p in owned if p not in to_install}
+                    
+                    if to_install:
+                        if batch:
+                            results.update(self._install_batch(to_install))
+                        else:
+                            for package in to_install:
+                                results[package] = self._pip_install([package])
+                                
+                        if any(results[package] for package in to_install):
+                            self.refresh_index()
+        finally:
+            with self._inflight_lock:
+                for package, future in owned.items():
+                    del self._inflight[self._requirement_key(package)]
+                    future.set_result(results.get(package, False))
+                    
+        for package, future in waiting.items():
+            logger.info(f"{package} zaten yükleniyor, sonucu bekleniyor")
+            results[package] = future.result()
+            
+        return results
+    
+    def _install_batch(self, packages: List[str]) -> Dict[str, bool]:
+        """Paketleri birlikte yükle, başarısız olursa listeyi ikiye bölerek hatalı olanı bul"""
+        try:
+            if self._pip_install(packages):
+                return {package: True for package in packages}
+        except subprocess.TimeoutExpired:
+            # Bölmek bekleme süresini katlar, tüm grubu başarısız say
+            return {package: False for package in packages}
+            
+        if len(packages) == 1:
+            return {packages[0]: False}
+            
+        middle = len(packages) // 2
+        results = self._install_batch(packages[:middle])
+        results.update(self._install_batch(packages[middle:]))
+        return results
+    
+    def _pip_install(self, packages: List[str], upgrade: bool = False) -> bool:
+        """Paketleri tek pip çağrısıyla yükle: önce wheel deposundan, yoksa depoya alıp oradan"""
+        names = ', '.join(packages)
+        timeout = 300 * len(packages)
+        install = ["install", "--disable-pip-version-check", *(["--upgrade"] if upgrade else [])]
+        offline = install + ["--no-index", *self.wheelhouse.find_links(), *packages]
+        try:
+            result = None
+            # Yükseltmede en yeni sürüm için indekse bakmak gerekir
+            if not upgrade and self.wheelhouse.has(packages):
+                result = run_pip(offline, timeout=timeout)
+                if result.returncode == 0:
+                    logger.info(f"✅ {names} wheel deposundan yüklendi")
+                    return True
+                    
+            try:
+                # Depodan kurulum denendiyse depodan çözümleme de başarısız olur, doğrudan indekse git
+                self.wheelhouse.build(packages, timeout=timeout, prefer_offline=not upgrade and result is None)
+                result = run_pip(offline, timeout=timeout)
+            except ResolutionError as e:
+                logger.error(f"❌ {names} yüklenemedi: {e}")
+                return False
+            except RuntimeError as e:
+                # Sadece derleme hataları: pip install farklı (ör. sdist) yoldan kurabilir
+                logger.warning(f"{names} için wheel hazırlanamadı, doğrudan yükleniyor: {e}")
+                result = run_pip(install + [*self.wheelhouse.find_links(), *index_args(self.index), *packages],
+                                 timeout=timeout)
+        except subprocess.TimeoutExpired:
+            logger.error(f"{names} yüklenirken zaman aşımı")
+            if len(packages) > 1:
+                raise
+            return False
+        except Exception as e:
+            logger.error(f"{names} yüklenirken hata: {e}")
+            return False
+            
+        success = result.returncode == 0
+        if success:
+            logger.info(f"✅ {names} yüklendi")
+        else:
+            logger.error(f"❌ {names} yüklenemedi: {result.stderr}")
+        return success
+    
+    def uninstall_package(self, package: str) -> bool:
+        """Paket kaldır"""
+        try:
+            with self._pip_lock:
+                result = run_pip(["uninstall", "-y", package], timeout=60)
+                
+                success = result.returncode == 0
+                if success:
+                    self.refresh_index()
+                    
+            if success:
+                logger.info(f"✅ {package} kaldırıldı")
+            else:
+                logger.error(f"❌ {package} kaldırılamadı: {result.stderr}")
+                
+            return success
+            
+        except Exception as e:
+            logger.error(f"Paket kaldırma hatası: {e}")
+            return False
+    
+    def update_package(self, package: str) -> bool:
+        """Paket güncelle"""
+        try:
+            with self._pip_lock:
+                success = self._pip_install([package], upgrade=True)
+                if success:
+                    self.refresh_index()
+                    
+            if success:
+                logger.info(f"✅ {package} güncellendi")
+            return success
+            
+        except Exception as e:
+            logger.error(f"Paket güncelleme hatası: {e}")
+            return False
+    
+    def is_package_installed(self, package_name: str) -> bool:
+        """Paket yüklü mü kontrol et"""
+        try:
+            # Paket adını temizle (versiyon vs varsa)
+            package_name = strip_requirement(package_name)
+            
+            # Paket yüklü mü kontrol et
+            self._sync_index()
+            return normalize_name(package_name) in self._index
+        except Exception:
+            return False
+    
+    def get_missing_requirements(self, path: str = 'requirements.txt') -> List[str]:
+        """requirements.txt'de olup yüklü olmayan paketler (dosya değişmedikçe yeniden okunmaz)"""
+        try:
+            mtime = os.stat(path).st_mtime
+        except FileNotFoundError:
+            logger.info("requirements.txt bulunamadı")
+            return []
+            
+        if self._requirements is None or self._requirements[0] != mtime:
+            with open(path, 'r') as f:
+                requirements = [line.strip() for line in f.read().splitlines()]
+            self._requirements = (mtime, [req for req in requirements if req and not req.startswith('#')])
+            
+        return [req for req in self._requirements[1] if not self.is_package_installed(req)]
+    
+    def check_missing_packages(self) -> List[str]:
+        """Eksik veya güncel olmayan paketleri kontrol et"""
+        missing_packages = []
+        
+        try:
+            # requirements.txt varsa kontrol et
+            missing_packages.extend(self.get_missing_requirements())
+                
+            # pip ile güncel olmayan paketleri kontrol et
+            result = run_pip(["list", "--outdated"], timeout=300)
+            
+            if result.returncode == 0:
+                lines = result.stdout.splitlines()
+                for line in lines[2:]:  # İlk 2 satır başlık
+                    if line.strip():
+                        package = line.split()[0]
+                        missing_packages.append(package)
+                        
+        except Exception as e:
+            logger.error(f"Paket kontrol hatası: {e}")
+            
+        return list(set(missing_packages))  # Benzersiz yap
@@ -0,0 +1,83 @@
+import time
+import logging
+import threading
+from typing import Dict, Hashable, Optional, Tuple
+from metrics import REGISTRY, MetricsRegistry
+
+logger = logging.getLogger(__name__)
+
+def parse_rate(rate: str) -> Optional[Tuple[float, float]]:
+    """Oran ayarını çöz: "5/60" -> (5 istek, 60 saniye); boş veya "0" ise sınırsız (None)"""
+    rate = rate.strip()
+    if not rate or rate == '0':
+        return None
+    count, _, period = rate.partition('/')
+    return float(count), float(period or 60)
+
+class TokenBucket:
+    """capacity kadar birikebilen, period saniyede capacity jeton dolan kova"""
+
+    def __init__(self, capacity: float, period: float):
+        self.capacity = capacity
+        self.rate = capacity / period
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def take(self, now: Optional[float] = None) -> float:
+        """Jeton al; alınabildiyse 0, alınamadıysa kaç saniye sonra alınabileceği"""
+        self._refill(time.monotonic() if now is None else now)
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def full(self, now: float) -> bool:
+        self._refill(now)
+        return self.tokens >= self.capacity
+
+class RateLimiter:
+    """Kullanıcı ve komut sınıfı başına jeton kovası
+
+    limits: komut sınıfı -> (istek sayısı, saniye); listede olmayan sınıflar sınırsızdır.
+    """
+
+    # Bu kadar kovadan sonra dolmuş (boşta) kovalar atılır
+    MAX_BUCKETS = 10000
+
+    def __init__(self, limits: Dict[str, Optional[Tuple[float, float]]]):
+        self.limits = {name: limit for name, limit in limits.items() if limit}
+        self._buckets: Dict[Tuple[Hashable, str], TokenBucket] = {}
+        self._lock = threading.Lock()
+        REGISTRY.add_callback(self._collect_metrics)
+
+    def check(self, user_id: Hashable, command_class: str) -> float:
+        """İsteğe izin verildiyse 0, verilmediyse önerilen bekleme süresi (saniye)"""
+        limit = self.limits.get(command_class)
+        if limit is None:
+            return 0.0
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get((user_id, command_class))
+            if bucket is None:
+                if len(self._buckets) >= self.MAX_BUCKETS:
+                    self._prune(now)
+                bucket = self._buckets[(user_id, command_class)] = TokenBucket(*limit)
+            wait = bucket.take(now)
+
+        if wait:
+            REGISTRY.inc('rate_limited_total', help_text="Sınıra takılan istekler",
+                         command_class=command_class, reason='user')
+        return wait
+
+    def _prune(self, now: float):
+        """Tamamen dolmuş kovaları at (yeniden oluşturulmaları aynı sonucu verir)"""
+        for key in [key for key, bucket in self._buckets.items() if bucket.full(now)]:
+            del self._buckets[key]
+
+    def _collect_metrics(self, registry: MetricsRegistry):
+        """Takip edilen kova sayısını göstergeye yaz"""
+        registry.set('rate_limit_buckets', len(self._buckets), "Takip edilen jeton kovası sayısı")
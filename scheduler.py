@@ -0,0 +1,132 @@
+import time
+import queue
+import logging
+import threading
+from collections import OrderedDict, deque
+from typing import Callable, Deque, Dict, Hashable, Tuple
+from metrics import REGISTRY, MetricsRegistry
+import config
+
+logger = logging.getLogger(__name__)
+
+class JobQueue:
+    """Kullanıcılar arasında sırayla (round-robin) dağıtan, sınırlı iş kuyruğu"""
+
+    def __init__(self, name: str, workers: int, maxsize: int):
+        self.name = name
+        self.workers = workers
+        self.maxsize = maxsize
+        # Kullanıcı -> bekleyen (eklenme zamanı, iş); sıradaki kullanıcı her zaman ilk eleman
+        self._users: "OrderedDict[Hashable, Deque[Tuple[float, Callable[[], None]]]]" = OrderedDict()
+        self._size = 0
+        self._running = 0
+        self._cond = threading.Condition()
+        self._threads = []
+
+    def start(self):
+        """İşçi thread'lerini başlat"""
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f"{self.name}-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    @property
+    def size(self) -> int:
+        """Bekleyen iş sayısı"""
+        return self._size
+
+    @property
+    def running(self) -> int:
+        """Çalışmakta olan iş sayısı"""
+        return self._running
+
+    def _jobs_ahead(self, user_id: Hashable) -> int:
+        """Kullanıcının yeni işinden önce çalışacak bekleyen iş sayısı"""
+        own = len(self._users.get(user_id, ()))
+        ahead = own
+        before = True
+        for other, jobs in self._users.items():
+            if other == user_id:
+                before = False
+                continue
+            # Sırada önde olan kullanıcılar bir tur fazla iş çalıştırır
+            ahead += min(len(jobs), own + 1 if before else own)
+        return ahead
+
+    def submit(self, user_id: Hashable, job: Callable[[], None]) -> int:
+        """İşi kuyruğa ekle ve sıradaki yerini döndür (0 = hemen başlıyor)
+
+        Kuyruk doluysa queue.Full fırlatır.
+        """
+        with self._cond:
+            if self._size >= self.maxsize:
+                raise queue.Full
+            ahead = self._jobs_ahead(user_id)
+            self._users.setdefault(user_id, deque()).append((time.monotonic(), job))
+            self._size += 1
+            self._cond.notify()
+
+            idle = self.workers - self._running - (self._size - 1)
+            return 0 if idle > 0 else ahead + 1
+
+    def _next_job(self) -> Tuple[float, Callable[[], None]]:
+        """Sıradaki kullanıcının ilk işini al, kullanıcıyı sona taşı"""
+        user_id, jobs = next(iter(self._users.items()))
+        job = jobs.popleft()
+        if jobs:
+            self._users.move_to_end(user_id)
+        else:
+            del self._users[user_id]
+        self._size -= 1
+        return job
+
+    def _work(self):
+        while True:
+            with self._cond:
+                while not self._users:
+                    self._cond.wait()
+                submitted_at, job = self._next_job()
+                self._running += 1
+            REGISTRY.observe('job_wait_seconds', time.monotonic() - submitted_at,
+                             "İşlerin kuyrukta bekleme süresi", queue=self.name)
+            try:
+                with REGISTRY.timer('job_duration_seconds', "İşlerin çalışma süresi", queue=self.name):
+                    job()
+            except Exception as e:
+                logger.error(f"{self.name} işi başarısız: {e}")
+            finally:
+                with self._cond:
+                    self._running -= 1
+
+
+class JobScheduler:
+    """Paket işlemleri ve script çalıştırma için ayrı kuyruklar"""
+
+    def __init__(self):
+        # Paket işlemleri site-packages üzerinde çakışmasın diye tek sıra halinde
+        self.installs = JobQueue('install', 1, config.INSTALL_QUEUE_SIZE)
+        self.executions = JobQueue('exec', config.EXEC_WORKERS, config.EXEC_QUEUE_SIZE)
+        REGISTRY.add_callback(self._collect_metrics)
+
+    def start(self):
+        self.installs.start()
+        self.executions.start()
+
+    def _collect_metrics(self, registry: MetricsRegistry):
+        """Kuyruk doluluklarını göstergelere yaz"""
+        for name, stats in self.stats().items():
+            registry.set('job_queue_depth', stats['queued'], "Kuyrukta bekleyen iş sayısı", queue=name)
+            registry.set('job_queue_running', stats['running'], "Çalışmakta olan iş sayısı", queue=name)
+            registry.set('job_queue_capacity', stats['capacity'], "Kuyruk kapasitesi", queue=name)
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Kuyruk doluluk bilgileri"""
+        return {
+            job_queue.name: {
+                'queued': job_queue.size,
+                'running': job_queue.running,
+                'capacity': job_queue.maxsize,
+                'workers': job_queue.workers,
+            }
+            for job_queue in (self.installs, self.executions)
+        }
@@ -0,0 +1,192 @@
+import os
+import time
+import uuid
+import shutil
+import logging
+import tempfile
+import threading
+from typing import Dict, NamedTuple, Optional
+from metrics import REGISTRY
+from fileutil import CHUNK_SIZE, sha256_stream
+import config
+
+logger = logging.getLogger(__name__)
+
+class StagedFile(NamedTuple):
+    # İçeriğin SHA-256 özeti (blobs/<sha256>)
+    sha256: str
+    # İşe özel çalışma dizinindeki kopya
+    path: str
+    # İşin çalışma dizini (release ile silinir)
+    workdir: str
+
+class UploadStaging:
+    """Yüklenen dosyaları içerik özetine göre bir kez saklar, her işe ayrı çalışma dizini verir
+
+    Dizin yapısı:
+        blobs/<sha256>      dosya içeriği (aynı içerik bir kez saklanır)
+        incoming/           indirilmekte olan dosyalar
+        jobs/<iş>/<ad>      işin çalışma dizini ve script kopyası
+
+    Kullanımda olan blob'lar referans sayılır; boşta kalıp TTL'i dolanlar silinir.
+    Telegram'ın file_unique_id değeri bilinen içeriğe eşlenir, aynı dosya tekrar indirilmez.
+    """
+
+    def __init__(self, root: Optional[str] = None, ttl: Optional[float] = None):
+        self.root = root or config.UPLOAD_DIR
+        self.ttl = ttl if ttl is not None else config.UPLOAD_TTL
+        self.blobs_dir = os.path.join(self.root, 'blobs')
+        self.incoming_dir = os.path.join(self.root, 'incoming')
+        self.jobs_dir = os.path.join(self.root, 'jobs')
+        for path in (self.blobs_dir, self.incoming_dir, self.jobs_dir):
+            os.makedirs(path, exist_ok=True)
+
+        # file_unique_id -> sha256
+        self._known: Dict[str, str] = {}
+        # sha256 -> kullanan iş sayısı
+        self._refs: Dict[str, int] = {}
+        # sha256 -> son kullanım zamanı
+        self._last_used: Dict[str, float] = {}
+        # Aynı dosyanın eşzamanlı indirmeleri tek indirmeye düşer
+        self._downloads: Dict[str, threading.Event] = {}
+        self._lock = threading.Lock()
+        self._last_sweep = time.monotonic()
+
+    def _blob_path(self, sha256: str) -> str:
+        return os.path.join(self.blobs_dir, sha256)
+
+    def known_digest(self, unique_id: str) -> Optional[str]:
+        """Daha önce indirilmiş dosyanın içerik özeti (file_unique_id ile), bilinmiyorsa None"""
+        with self._lock:
+            return self._known.get(unique_id)
+
+    def stage(self, document, file_name: Optional[str] = None) -> StagedFile:
+        """Telegram belgesini (gerekirse indirerek) sakla ve işe özel kopyasını hazırla"""
+        self._maybe_sweep()
+        unique_id = document.file_unique_id
+        while True:
+            with self._lock:
+                sha256 = self._known.get(unique_id)
+                if sha256 and os.path.exists(self._blob_path(sha256)):
+                    self._acquire(sha256)
+                    REGISTRY.inc('upload_staging_total', help_text="Yüklenen dosya hazırlama", result='hit')
+                    break
+                pending = self._downloads.get(unique_id)
+                if pending is None:
+                    self._downloads[unique_id] = threading.Event()
+            if pending is not None:
+                pending.wait()
+                continue
+
+            try:
+                sha256 = self._download(document)
+                with self._lock:
+                    self._known[unique_id] = sha256
+                    self._acquire(sha256)
+                REGISTRY.inc('upload_staging_total', help_text="Yüklenen dosya hazırlama", result='download')
+            finally:
+                with self._lock:
+                    self._downloads.pop(unique_id).set()
+            break
+
+        try:
+            return self._make_workdir(sha256, file_name or document.file_name)
+        except Exception:
+            self.release_blob(sha256)
+            raise
+
+    def _acquire(self, sha256: str):
+        self._refs[sha256] = self._refs.get(sha256, 0) + 1
+        self._last_used[sha256] = time.time()
+
+    def _download(self, document) -> str:
+        """Dosyayı belleğe almadan diske akıt, özetini hesaplayıp blob olarak sakla"""
+        telegram_file = document.get_file()
+        fd, tmp_path = tempfile.mkstemp(dir=self.incoming_dir)
+        try:
+            with os.fdopen(fd, 'wb') as out:
+                if os.path.isfile(telegram_file.file_path or ''):
+                    # Yerel Bot API sunucusu dosya yolunu doğrudan verir
+                    with open(telegram_file.file_path, 'rb') as source:
+                        sha256 = sha256_stream(iter(lambda: source.read(CHUNK_SIZE), b''), out)
+                else:
+                    import requests
+                    with requests.get(telegram_file.file_path, stream=True, timeout=60) as response:
+                        response.raise_for_status()
+                        sha256 = sha256_stream(response.iter_content(CHUNK_SIZE), out)
+
+            target = self._blob_path(sha256)
+            if os.path.exists(target):
+                os.remove(tmp_path)
+            else:
+                os.replace(tmp_path, target)
+            return sha256
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def _make_workdir(self, sha256: str, file_name: str) -> StagedFile:
+        """İşe özel dizin ve içine script'in kopyası (script kendi dosyasını değiştirse de blob bozulmaz)"""
+        workdir = os.path.join(self.jobs_dir, uuid.uuid4().hex)
+        os.makedirs(workdir)
+        path = os.path.join(workdir, os.path.basename(file_name) or 'script.py')
+        shutil.copyfile(self._blob_path(sha256), path)
+        return StagedFile(sha256, path, workdir)
+
+    def release(self, staged: StagedFile):
+        """İşin çalışma dizinini sil ve blob referansını bırak"""
+        shutil.rmtree(staged.workdir, ignore_errors=True)
+        self.release_blob(staged.sha256)
+
+    def release_blob(self, sha256: str):
+        with self._lock:
+            refs = self._refs.get(sha256, 0) - 1
+            if refs > 0:
+                self._refs[sha256] = refs
+            else:
+                self._refs.pop(sha256, None)
+            self._last_used[sha256] = time.time()
+
+    def _maybe_sweep(self):
+        """En fazla dakikada bir süresi dolan blob'ları temizle"""
+        now = time.monotonic()
+        if now - self._last_sweep < 60:
+            return
+        self._last_sweep = now
+        self.sweep()
+
+    def sweep(self):
+        """Kullanılmayan ve TTL'i dolmuş blob'ları, sahipsiz dosyaları sil"""
+        cutoff = time.time() - self.ttl
+        removed = 0
+        with self._lock:
+            for name in os.listdir(self.blobs_dir):
+                if self._refs.get(name):
+                    continue
+                path = self._blob_path(name)
+                try:
+                    last_used = self._last_used.get(name) or os.stat(path).st_mtime
+                    if last_used < cutoff:
+                        os.remove(path)
+                        self._last_used.pop(name, None)
+                        removed += 1
+                except FileNotFoundError:
+                    pass
+            self._known = {unique_id: sha for unique_id, sha in self._known.items()
+                           if os.path.exists(self._blob_path(sha))}
+
+        # Çökme sonrası kalan yarım indirmeler ve iş dizinleri
+        for directory in (self.incoming_dir, self.jobs_dir):
+            for name in os.listdir(directory):
+                path = os.path.join(directory, name)
+                try:
+                    if os.stat(path).st_mtime < cutoff:
+                        if os.path.isdir(path):
+                            shutil.rmtree(path, ignore_errors=True)
+                        else:
+                            os.remove(path)
+                except FileNotFoundError:
+                    pass
+        if removed:
+            logger.info(f"🧹 {removed} eski yükleme silindi")
@@ -0,0 +1,123 @@
+import hmac
+import json
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Optional, Tuple
+from scheduler import JobScheduler
+from metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+# Telegram güncellemeleri küçüktür; daha büyük gövdeler reddedilir
+MAX_BODY_BYTES = 1024 * 1024
+
+class WebhookServer:
+    """Telegram webhook'larını alıp dispatcher kuyruğuna veren HTTP sunucusu
+
+    Rotalar:
+        POST /<gizli yol>   Telegram güncellemesi (JSON)
+        GET  /health        canlılık + kuyruk doluluğu (her zaman 200)
+        GET  /ready         hazır ve kuyruklar dolu değilse 200, değilse 503
+
+    admission: kuyruk adı -> yeni işlerin reddedildiği bekleyen iş sayısı; kuyruk
+    bu eşiğe ulaştığında dolu sayılır (verilmeyen kuyruklar için kapasite).
+    """
+
+    def __init__(self, secret_path: str, on_update: Callable[[dict], None],
+                 scheduler: JobScheduler, update_queue, listen: str = '0.0.0.0', port: int = 8080,
+                 admission: Optional[Dict[str, int]] = None):
+        self.secret_path = ('/' + secret_path.strip('/')).encode()
+        self.on_update = on_update
+        self.scheduler = scheduler
+        self.update_queue = update_queue
+        self.admission = admission or {}
+        self.ready = False
+        self.server = ThreadingHTTPServer((listen, port), self._handler_class())
+        self.server.daemon_threads = True
+
+    @property
+    def port(self) -> int:
+        return self.server.server_address[1]
+
+    def health(self) -> Tuple[bool, dict]:
+        """(hazır mı, durum bilgisi) - kuyruklardan biri doluysa hazır sayılmaz"""
+        queues = self.scheduler.stats()
+        for name, stats in queues.items():
+            stats['limit'] = min(stats['capacity'], self.admission.get(name, stats['capacity']))
+        saturated = [name for name, stats in queues.items() if stats['queued'] >= stats['limit']]
+        payload = {
+            'status': 'saturated' if saturated else ('ok' if self.ready else 'starting'),
+            'ready': self.ready and not saturated,
+            'saturated': saturated,
+            'queues': queues,
+            'pending_updates': self.update_queue.qsize(),
+        }
+        return payload['ready'], payload
+
+    def _handler_class(self):
+        webhook = self
+
+        class WebhookHandler(BaseHTTPRequestHandler):
+            def _reply(self, code: int, payload: dict):
+                body = json.dumps(payload).encode()
+                self.send_response(code)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                path = self.path.split('?')[0]
+                if path not in ('/health', '/ready'):
+                    self._reply(404, {'error': 'not found'})
+                    return
+                ready, payload = webhook.health()
+                self._reply(200 if path == '/health' or ready else 503, payload)
+
+            def do_POST(self):
+                if not hmac.compare_digest(self.path.split('?')[0].encode(), webhook.secret_path):
+                    REGISTRY.inc('webhook_updates_total', help_text="Webhook istekleri", result='forbidden')
+                    self._reply(403, {'error': 'forbidden'})
+                    return
+
+                length = int(self.headers.get('Content-Length') or 0)
+                if length <= 0 or length > MAX_BODY_BYTES:
+                    REGISTRY.inc('webhook_updates_total', help_text="Webhook istekleri", result='rejected')
+                    self._reply(413 if length else 400, {'error': 'invalid body size'})
+                    return
+
+                try:
+                    data = json.loads(self.rfile.read(length))
+                    webhook.on_update(data)
+                except Exception as e:
+                    logger.warning(f"Webhook güncellemesi işlenemedi: {e}")
+                    REGISTRY.inc('webhook_updates_total', help_text="Webhook istekleri", result='rejected')
+                    self._reply(400, {'error': 'invalid update'})
+                    return
+
+                REGISTRY.inc('webhook_updates_total', help_text="Webhook istekleri", result='accepted')
+                self._reply(200, {'ok': True})
+
+            def log_message(self, format, *args):
+                logger.debug(format % args)
+
+        return WebhookHandler
+
+    def start(self):
+        """Sunucuyu arka planda başlat"""
+        self.ready = True
+        threading.Thread(target=self.serve_forever, name='webhook-http', daemon=True).start()
+
+    def serve_forever(self):
+        """İstekleri bu thread'de karşıla"""
+        logger.info(f"🌐 Webhook sunucusu {self.server.server_address[0]}:{self.port} adresinde dinliyor")
+        self.ready = True
+        self.server.serve_forever()
+
+    def shutdown(self):
+        """Sunucuyu durdur (hiç başlatılmadıysa sadece soketi kapat)"""
+        if self.ready:
+            self.ready = False
+            self.server.shutdown()
+        self.server.server_close()
@@ -0,0 +1,428 @@
+import os
+import sys
+import json
+import time
+import base64
+import queue
+import select
+import signal
+import logging
+import subprocess
+import threading
+from typing import Callable, Dict, List, NamedTuple, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Çıktı parçası geri çağrısı: (akış adı 'stdout'/'stderr', veri)
+OutputCallback = Callable[[str, bytes], None]
+
+class ResourceLimits(NamedTuple):
+    """İş başına kaynak sınırları (0 = sınırsız)"""
+    cpu_seconds: int = 0
+    memory_mb: int = 0
+    open_files: int = 0
+    processes: int = 0
+
+class JobUsage(NamedTuple):
+    """İşin gerçekte kullandığı kaynaklar"""
+    cpu_seconds: float
+    peak_rss_mb: float
+    wall_seconds: float
+
+class PoolUnavailable(RuntimeError):
+    """Boşta hazır worker yok; iş yeni bir süreçte çalıştırılmalı"""
+
+def apply_limits(limits: ResourceLimits, pid: int = 0):
+    """rlimit'leri uygula (pid 0 ise çağıran sürece)"""
+    import resource
+
+    for name, value in ((resource.RLIMIT_CPU, limits.cpu_seconds),
+                        (resource.RLIMIT_AS, limits.memory_mb * 1024 * 1024),
+                        (resource.RLIMIT_NOFILE, limits.open_files),
+                        (resource.RLIMIT_NPROC, limits.processes)):
+        if value <= 0:
+            continue
+        _, hard = resource.prlimit(pid, name)
+        # CPU sınırında önce SIGXCPU gelsin, bir saniye sonra SIGKILL
+        new_hard = value + 1 if name == resource.RLIMIT_CPU else value
+        if hard != resource.RLIM_INFINITY:
+            new_hard = min(new_hard, hard)
+        resource.prlimit(pid, name, (min(value, new_hard), new_hard))
+
+def _usage(rusage, started: float) -> JobUsage:
+    # ru_maxrss Linux'ta KB, macOS'ta bayt cinsindendir
+    scale = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    return JobUsage(rusage.ru_utime + rusage.ru_stime, rusage.ru_maxrss / scale,
+                    time.monotonic() - started)
+
+class Worker:
+    """Önceden modül yüklemiş, her iş için çatallanan (fork) yorumlayıcı süreci"""
+
+    def __init__(self, preload: List[str], generation: Optional[str] = None):
+        self.generation = generation
+        self.jobs = 0
+        self.ready = False
+        # Ön yüklemeden sonra worker'da import edilmiş üst seviye modüller
+        self.loaded_modules: Set[str] = set()
+        self._buffer = b''
+        self._ready_lock = threading.Lock()
+        self.process = subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), ','.join(preload)],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+        )
+
+    def alive(self) -> bool:
+        return self.process.poll() is None
+
+    def _read_message(self, timeout: float) -> Optional[dict]:
+        """Worker'dan bir JSON satırı oku, süre dolarsa None döndür
+
+        Okuma kendi tamponumuzla yapılır; dosya nesnesinin tamponunda bekleyen
+        satırları select göremeyeceği için readline kullanılmaz.
+        """
+        deadline = time.monotonic() + timeout
+        fd = self.process.stdout.fileno()
+        while b'\n' not in self._buffer:
+            ready, _, _ = select.select([fd], [], [], max(deadline - time.monotonic(), 0))
+            if not ready:
+                return None
+            chunk = os.read(fd, 65536)
+            if not chunk:
+                raise EOFError("Worker kapandı")
+            self._buffer += chunk
+        line, _, self._buffer = self._buffer.partition(b'\n')
+        return json.loads(line)
+
+    def wait_ready(self, timeout: float) -> bool:
+        """Ön yüklemenin bitmesini bekle"""
+        with self._ready_lock:
+            if not self.ready:
+                message = self._read_message(timeout)
+                self.ready = bool(message and message.get('ready'))
+                if self.ready:
+                    self.loaded_modules = set(message.get('modules', []))
+        return self.ready
+
+    def run(self, job: dict, timeout: float, on_output: OutputCallback) -> dict:
+        """İşi worker'a gönder, çıktı parçalarını iletip sonucunu bekle"""
+        self.jobs += 1
+        self.process.stdin.write((json.dumps(job) + '\n').encode())
+        self.process.stdin.flush()
+
+        # Worker zaman aşımını kendisi uygular, burada sadece takılmaya karşı pay bırakılır
+        deadline = time.monotonic() + timeout + 5
+        while True:
+            message = self._read_message(deadline - time.monotonic())
+            if message is None:
+                raise TimeoutError("Worker yanıt vermedi")
+            if 'stream' not in message:
+                return message
+            on_output(message['stream'], base64.b64decode(message['data']))
+
+    def stop(self):
+        """Worker'ı kapat"""
+        try:
+            self.process.stdin.close()
+            self.process.wait(timeout=5)
+        except Exception:
+            self.process.kill()
+            self.process.wait()
+
+
+class WorkerPool:
+    """Isınmış yorumlayıcı havuzu
+
+    İşler worker beklemez: boşta hazır worker yoksa PoolUnavailable fırlatılır
+    ve çağıran işi yeni bir süreçte çalıştırır.
+    """
+
+    def __init__(self, size: int, preload: List[str], max_jobs: int = 50):
+        self.size = size
+        self.preload = preload
+        self.max_jobs = max_jobs
+        self._idle: "queue.Queue[Worker]" = queue.Queue()
+        self._generation: Optional[str] = None
+        # Son hazır olan worker'ın yüklü modülleri (henüz bilinmiyorsa None)
+        self.loaded_modules: Optional[Set[str]] = None
+
+    def start(self, generation: Optional[str] = None):
+        """Worker'ları arka planda başlat"""
+        self._generation = generation
+        for _ in range(self.size):
+            self._idle.put(self._spawn())
+
+    def conflicts(self, modules: List[str]) -> bool:
+        """Verilen modüllerden biri worker'larda zaten yüklü mü
+
+        Yüklüyse script ortamdaki sürüm yerine ön yüklenmiş olanı görür. Hiçbir
+        worker henüz hazır değilse çakışma varsayılır.
+        """
+        loaded = self.loaded_modules
+        return loaded is None or bool(loaded.intersection(modules))
+
+    def _spawn(self) -> Worker:
+        worker = Worker(self.preload, self._generation)
+        threading.Thread(target=self._warm_up, args=(worker,), daemon=True).start()
+        return worker
+
+    def _warm_up(self, worker: Worker):
+        """Ön yüklemeyi arka planda bekle; başarısız worker kapatılır, ilk işte yenilenir"""
+        try:
+            if worker.wait_ready(60):
+                self.loaded_modules = worker.loaded_modules
+                return
+            logger.warning("Worker ön yüklemeyi zamanında bitiremedi")
+        except Exception as e:
+            logger.warning(f"Worker başlatılamadı: {e}")
+        worker.stop()
+
+    def _recycle(self, worker: Worker):
+        """Worker'ı kapatıp yerine yenisini koy"""
+        threading.Thread(target=worker.stop, daemon=True).start()
+        self._idle.put(self._spawn())
+
+    def run(self, file_path: str, timeout: float, on_output: OutputCallback,
+            generation: Optional[str] = None, sys_path: Optional[List[str]] = None,
+            limits: ResourceLimits = ResourceLimits()) -> Tuple[int, bool, JobUsage]:
+        """Dosyayı boştaki bir worker'da çalıştır
+
+        (dönüş kodu, zaman aşımı oldu mu, kaynak kullanımı) döndürür. Boşta hazır
+        worker yoksa beklemeden, worker iş çıktı vermeden bozulursa da PoolUnavailable
+        fırlatır.
+        """
+        # Yüklü paketler değiştiyse ön yüklenmiş modüller bayatlamış olabilir
+        if generation is not None:
+            self._generation = generation
+
+        try:
+            worker = self._idle.get_nowait()
+            while worker.generation != self._generation or not worker.alive():
+                self._recycle(worker)
+                worker = self._idle.get_nowait()
+        except queue.Empty:
+            raise PoolUnavailable("Boşta worker yok")
+
+        if not worker.ready:
+            # Henüz ısınıyor; hazır olunca sıradaki işler kullanır
+            self._idle.put(worker)
+            raise PoolUnavailable("Worker hazır değil")
+
+        relayed = []
+
+        def relay(stream: str, data: bytes):
+            relayed.append(True)
+            on_output(stream, data)
+
+        try:
+            result = worker.run({
+                'path': file_path,
+                'cwd': os.path.dirname(file_path) or None,
+                'sys_path': sys_path or [],
+                'limits': list(limits),
+                'timeout': timeout,
+            }, timeout, relay)
+        except Exception as e:
+            logger.error(f"Worker hatası: {e}")
+            self._recycle(worker)
+            # Script çıktı vermeden worker bozulduysa iş yeni süreçte tekrarlanabilir;
+            # zaman aşımında script süresini zaten doldurmuştur
+            if not relayed and not isinstance(e, TimeoutError):
+                raise PoolUnavailable(f"Worker hatası: {e}") from e
+            raise
+
+        if worker.jobs >= self.max_jobs:
+            self._recycle(worker)
+        else:
+            self._idle.put(worker)
+
+        return result['returncode'], result['timed_out'], JobUsage(*result['usage'])
+
+    def shutdown(self):
+        """Tüm worker'ları kapat"""
+        while True:
+            try:
+                self._idle.get_nowait().stop()
+            except queue.Empty:
+                break
+
+
+def _run_child(job: dict, stdout_fd: int, stderr_fd: int):
+    """Çatallanan süreçte script'i taze bir namespace'te çalıştır"""
+    import io
+    import runpy
+    import atexit
+    import importlib
+    import traceback
+
+    # Zaman aşımında script'in başlattığı alt süreçlerle birlikte öldürülebilsin
+    os.setpgrp()
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+
+    for fd, target in ((1, stdout_fd), (2, stderr_fd)):
+        os.dup2(target, fd)
+        os.close(target)
+    sys.stdout = io.TextIOWrapper(io.FileIO(1, 'w', closefd=False), encoding='utf-8',
+                                  errors='backslashreplace', line_buffering=False)
+    sys.stderr = io.TextIOWrapper(io.FileIO(2, 'w', closefd=False), encoding='utf-8',
+                                  errors='backslashreplace', line_buffering=True)
+
+    code = 0
+    try:
+        apply_limits(ResourceLimits(*job['limits']))
+        if job['cwd']:
+            os.chdir(job['cwd'])
+        sys.argv = [job['path']]
+        # Script dizini ve varsa izole ortam, yorumlayıcının kendi yollarından önce gelir
+        sys.path[0:1] = [os.path.dirname(os.path.abspath(job['path']))] + job['sys_path']
+        importlib.invalidate_caches()
+        runpy.run_path(job['path'], run_name='__main__')
+    except SystemExit as e:
+        if e.code is None:
+            code = 0
+        elif isinstance(e.code, int):
+            code = e.code
+        else:
+            print(e.code, file=sys.stderr)
+            code = 1
+    except BaseException as e:
+        # Worker'a ait çerçeveleri atla, traceback script'ten başlasın
+        tb = e.__traceback__
+        while tb is not None and tb.tb_frame.f_code.co_filename != job['path']:
+            tb = tb.tb_next
+        traceback.print_exception(type(e), e, tb)
+        code = 1
+
+    # Normal yorumlayıcı kapanışını taklit et
+    try:
+        for thread in threading.enumerate():
+            if thread is not threading.main_thread() and not thread.daemon:
+                thread.join()
+        atexit._run_exitfuncs()
+    except BaseException:
+        traceback.print_exc()
+        code = code or 1
+    finally:
+        for stream in (sys.stdout, sys.stderr):
+            try:
+                stream.flush()
+            except Exception:
+                pass
+        os._exit(code)
+
+
+def pump_process(pid: int, stdout_fd: int, stderr_fd: int, timeout: float,
+                 on_output: OutputCallback) -> Tuple[int, bool, JobUsage]:
+    """Sürecin çıktı borularını okuyup ilet, bitmesini zaman aşımıyla bekle
+
+    (dönüş kodu, zaman aşımı oldu mu, kaynak kullanımı) döndürür. Süreç kendi süreç
+    grubunun lideri olmalıdır; zaman aşımında tüm grup öldürülür. Borular kapatılır.
+    """
+    started = time.monotonic()
+    deadline = started + timeout
+    rusage = None
+    streams: Dict[int, str] = {stdout_fd: 'stdout', stderr_fd: 'stderr'}
+    status = None
+    timed_out = False
+
+    def read_ready(wait: float):
+        ready, _, _ = select.select(list(streams), [], [], wait)
+        for fd in ready:
+            data = os.read(fd, 65536)
+            if data:
+                on_output(streams[fd], data)
+            else:
+                os.close(fd)
+                del streams[fd]
+        return ready
+
+    try:
+        while status is None:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                try:
+                    os.killpg(pid, signal.SIGKILL)
+                except ProcessLookupError:
+                    os.kill(pid, signal.SIGKILL)
+                _, status, rusage = os.wait4(pid, 0)
+                timed_out = True
+                break
+
+            if streams and read_ready(min(remaining, 0.1)) and streams:
+                continue
+
+            # Borular kapandıysa veya bir süredir veri yoksa sürecin bitip bitmediğine bak
+            done, wait_status, wait_rusage = os.wait4(pid, os.WNOHANG)
+            if done:
+                status, rusage = wait_status, wait_rusage
+            elif not streams:
+                time.sleep(min(remaining, 0.005))
+
+        # Süreç bittikten sonra borularda kalan veriyi al (alt süreçler açık tutuyorsa bekleme)
+        while streams and read_ready(0):
+            pass
+    finally:
+        for fd in streams:
+            os.close(fd)
+
+    return os.waitstatus_to_exitcode(status), timed_out, _usage(rusage, started)
+
+
+def worker_main(preload: List[str]):
+    """Worker süreci: modülleri yükle, işleri oku ve her biri için fork et"""
+    # Protokol kanalları script'in stdin/stdout'undan ayrılır
+    commands = os.fdopen(os.dup(0), 'r')
+    replies = os.fdopen(os.dup(1), 'w')
+    devnull = os.open(os.devnull, os.O_RDWR)
+    os.dup2(devnull, 0)
+    os.dup2(devnull, 1)
+    os.close(devnull)
+
+    def send(message: dict):
+        replies.write(json.dumps(message) + '\n')
+        replies.flush()
+
+    def relay(stream: str, data: bytes):
+        send({'stream': stream, 'data': base64.b64encode(data).decode('ascii')})
+
+    for module in preload:
+        try:
+            __import__(module)
+        except Exception:
+            pass
+
+    send({'ready': True, 'modules': sorted({name.split('.')[0] for name in sys.modules})})
+
+    for line in commands:
+        job = json.loads(line)
+        stdout_r, stdout_w = os.pipe()
+        stderr_r, stderr_w = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            commands.close()
+            replies.close()
+            os.close(stdout_r)
+            os.close(stderr_r)
+            _run_child(job, stdout_w, stderr_w)
+        os.close(stdout_w)
+        os.close(stderr_w)
+        returncode, timed_out, usage = pump_process(pid, stdout_r, stderr_r, job['timeout'], relay)
+        send({'returncode': returncode, 'timed_out': timed_out, 'usage': list(usage)})
+
+
+def exec_limited(limits: ResourceLimits, argv: List[str]):
+    """Sınırları uygulayıp bu süreci argv ile değiştir (rlimit'ler exec sonrası da geçerlidir)"""
+    apply_limits(limits)
+    os.execv(argv[0], argv)
+
+
+def limited_command(limits: ResourceLimits, file_path: str) -> List[str]:
+    """Script'i daha ilk satırından itibaren sınırlarla çalıştıran komut (soğuk yol için)"""
+    return [sys.executable, os.path.abspath(__file__), '--limited',
+            ','.join(str(value) for value in limits), sys.executable, os.path.abspath(file_path)]
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1 and sys.argv[1] == '--limited':
+        exec_limited(ResourceLimits(*(int(value) for value in sys.argv[2].split(','))), sys.argv[3:])
+    worker_main([name for name in sys.argv[1].split(',') if name] if len(sys.argv) > 1 else [])